@@ -1,5 +1,8 @@
+from django import forms
 from django.contrib import admin
-from .models import Category, Dish, Order, OrderItem, Review
+from . import search
+from .models import ALL_TAGS, TAG_BITS, TAG_CHOICES, Category, Dish, Order, OrderItem, Review, TagMaskField
+from .serializers import TAG_LABELS
 
 admin.site.register(Category)
 
@@ -27,12 +30,39 @@ class OrderAdmin(admin.ModelAdmin):
     is_admin_user.short_description = 'Адмін'
 
 
+class TagFilter(admin.SimpleListFilter):
+    title = 'Теги'
+    parameter_name = 'tag'
+
+    def lookups(self, request, model_admin):
+        return TAG_CHOICES
+
+    def queryset(self, request, queryset):
+        if self.value() in TAG_BITS:
+            return queryset.filter(tags__any=TAG_BITS[self.value()])
+        return queryset
+
+
 @admin.register(Dish)
 class DishAdmin(admin.ModelAdmin):
-    list_display = ('name', 'category', 'price', 'rating', 'is_available', 'tags')
-    list_filter = ('category', 'is_available', 'tags')
+    list_display = ('name', 'category', 'price', 'rating', 'is_available', 'tag_labels')
+    list_filter = ('category', 'is_available', TagFilter)
     search_fields = ('name', 'description')
     list_editable = ('price', 'is_available')
+    readonly_fields = ('rating',)
+    # інакше адмінка підставить AdminIntegerFieldWidget (TagMaskField — теж IntegerField)
+    formfield_overrides = {TagMaskField: {'widget': forms.CheckboxSelectMultiple}}
+
+    def get_search_results(self, request, queryset, search_term):
+        # той самий FTS5-індекс, що й ?q= в API, замість LIKE по search_fields
+        if not search_term or not search.is_supported():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=search.search_ids(search_term, queryset)), False
+
+    def tag_labels(self, obj):
+        return ', '.join(TAG_LABELS[obj.tags & ALL_TAGS])
+
+    tag_labels.short_description = 'Теги'
 
 
 @admin.register(Review)
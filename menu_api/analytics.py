@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import DailyDishSales, OrderItem
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+REVENUE = ExpressionWrapper(F('price') * F('quantity'), output_field=MONEY)
+
+
+def apply_order(order, sign=1):
+    """
+    Додає (sign=1) або віднімає (sign=-1) завершене замовлення з денних підсумків
+    одним INSERT ... ON CONFLICT DO UPDATE на всі його позиції.
+    Позиції мають бути підвантажені разом зі стравами (orders_with_items).
+    """
+    items = list(order.items.all())
+    if not items:
+        return
+
+    day = timezone.localdate(order.date)
+    table = DailyDishSales._meta.db_table
+    with connection.cursor() as cursor:
+        if sign > 0:
+            rows = [
+                (day, item.dish_id, item.dish.category_id, item.quantity, item.price * item.quantity, 1)
+                for item in items
+            ]
+            placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(rows))
+            cursor.execute(
+                f"INSERT INTO {table} (day, dish_id, category_id, quantity, revenue, order_count) "
+                f"VALUES {placeholders} "
+                f"ON CONFLICT (day, dish_id) DO UPDATE SET "
+                f"quantity = {table}.quantity + excluded.quantity, "
+                # SQLite тримає decimal як NUMERIC: округлюємо, щоб суми не накопичували похибку
+                f"revenue = ROUND({table}.revenue + excluded.revenue, 2), "
+                f"order_count = {table}.order_count + excluded.order_count",
+                [value for row in rows for value in row],
+            )
+        else:
+            # замовлення могли завершити ще до появи підсумків — не йдемо в мінус
+            cursor.executemany(
+                f"UPDATE {table} SET "
+                f"quantity = CASE WHEN quantity > %s THEN quantity - %s ELSE 0 END, "
+                f"revenue = CASE WHEN revenue > %s THEN ROUND(revenue - %s, 2) ELSE 0 END, "
+                f"order_count = CASE WHEN order_count > 1 THEN order_count - 1 ELSE 0 END "
+                f"WHERE day = %s AND dish_id = %s",
+                [
+                    (item.quantity, item.quantity, item.price * item.quantity, item.price * item.quantity, day, item.dish_id)
+                    for item in items
+                ],
+            )
+
+
+def rebuild(date_from=None, date_to=None, batch_size=1000):
+    """
+    Перераховує підсумки з історії одним груповим запитом по OrderItem.
+    Видалення і вставка — в одній транзакції: звіт не побачить напівпорожніх підсумків.
+    """
+    rollups = DailyDishSales.objects.all()
+    items = OrderItem.objects.filter(order__status='COMPLETED')
+    if date_from:
+        rollups = rollups.filter(day__gte=date_from)
+        items = items.filter(order__date__date__gte=date_from)
+    if date_to:
+        rollups = rollups.filter(day__lte=date_to)
+        items = items.filter(order__date__date__lte=date_to)
+
+    grouped = (
+        items.annotate(day=TruncDate('order__date'))
+        .values('day', 'dish_id', 'dish__category_id')
+        .annotate(total_quantity=Sum('quantity'), total_revenue=Sum(REVENUE), orders=Count('order', distinct=True))
+        .order_by()
+    )
+    rows = [
+        DailyDishSales(
+            day=row['day'], dish_id=row['dish_id'], category_id=row['dish__category_id'],
+            quantity=row['total_quantity'], revenue=row['total_revenue'], order_count=row['orders'],
+        )
+        for row in grouped.iterator()
+    ]
+    with transaction.atomic():
+        rollups.delete()
+        DailyDishSales.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def sales_report(date_from, date_to, category=None, limit=10):
+    """
+    Звіт за діапазон днів; читає лише DailyDishSales (+ назви страв/категорій).
+    Виручка — Decimal; у відповідь іде через SalesReportSerializer.
+    """
+    rollups = DailyDishSales.objects.filter(day__gte=date_from, day__lte=date_to)
+    if category:
+        rollups = rollups.filter(category__name__iexact=category)
+
+    sums = {
+        'quantity': Coalesce(Sum('quantity'), 0),
+        'revenue': Coalesce(Sum('revenue'), Value(Decimal('0.00')), output_field=MONEY),
+    }
+    return {
+        'date_from': date_from,
+        'date_to': date_to,
+        'totals': rollups.aggregate(**sums),
+        'by_day': list(rollups.values('day').annotate(**sums).order_by('day')),
+        'by_category': list(
+            rollups.values('category_id', name=F('category__name')).annotate(**sums).order_by('-revenue')
+        ),
+        'top_dishes': list(
+            rollups.values('dish_id', name=F('dish__name'))
+            .annotate(**sums, orders=Sum('order_count'))
+            .order_by('-quantity')[:limit]
+        ),
+    }
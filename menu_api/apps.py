@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MenuApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'menu_api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
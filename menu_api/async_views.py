@@ -0,0 +1,115 @@
+"""
+Async-версії читаючих ендпоінтів меню для ASGI-сервера.
+
+Змонтовані поруч із sync-версіями під /api/async/ і віддають ті самі байти:
+фільтри, серіалізатори, знімки меню та ETag спільні з DishViewSet. Під ASGI
+запит не тримає потік з пулу, поки чекає на базу, — чекає лише корутина.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework.request import Request
+
+from . import cache as menu_cache
+from . import search
+from .models import Dish, Review
+from .pagination import DateCursorPagination
+from .renderers import FastJSONRenderer
+from .serializers import (
+    DISH_LIST_COLUMNS, DishDetailSerializer, DishListSerializer, ReviewSerializer, dish_list_row,
+)
+from .views import filter_dishes, latest_reviews_prefetch, rank_by_ids, requested_fields, search_dishes
+
+renderer = FastJSONRenderer()
+
+
+def json_response(data, status=200, headers=None):
+    return HttpResponse(
+        renderer.render(data), status=status, headers=headers, content_type=renderer.media_type
+    )
+
+
+def not_found():
+    return json_response({'detail': 'No Dish matches the given query.'}, status=404)
+
+
+async def dish_queryset(request, fields):
+    queryset = Dish.objects.filter(is_available=True)
+    if fields is None or 'category' in fields:
+        queryset = queryset.select_related('category')
+    queryset = filter_dishes(queryset, request.query_params)
+    query = request.query_params.get('q', '').strip()
+    if query:
+        if search.is_supported():
+            ids = await sync_to_async(search.search_ids)(query, queryset)
+            queryset = rank_by_ids(queryset, ids)
+        else:
+            queryset = search_dishes(queryset, query)
+    return queryset
+
+
+async def snapshot_response(request, scope, build):
+    # той самий ключ, що й у DishViewSet: sync і async ділять знімки
+    key = await sync_to_async(menu_cache.snapshot_key)(request, scope)
+    snapshot = menu_cache.get_snapshot(key)
+    if snapshot is None:
+        data = await build()
+        if data is None:
+            return not_found()
+        snapshot = menu_cache.store_snapshot(key, data)
+
+    etag, data = snapshot
+    if menu_cache.etag_matches(request, etag):
+        return HttpResponse(status=304, headers={'ETag': etag})
+    return json_response(data, headers={'ETag': etag})
+
+
+async def dish_list(request):
+    """GET /api/async/dishes/ — те саме, що GET /api/dishes/."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    request = Request(request)
+
+    async def build():
+        fields = requested_fields(request.query_params, DishListSerializer)
+        queryset = await dish_queryset(request, fields)
+        if settings.FAST_LIST_RENDERING and fields is None:
+            return [dish_list_row(row, request) async for row in queryset.values_list(*DISH_LIST_COLUMNS)]
+        dishes = [dish async for dish in queryset]
+        return DishListSerializer(dishes, many=True, context={'request': request}, fields=fields).data
+
+    return await snapshot_response(request, 'list', build)
+
+
+async def dish_detail(request, pk):
+    """GET /api/async/dishes/<pk>/ — те саме, що GET /api/dishes/<pk>/."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    request = Request(request)
+
+    async def build():
+        fields = requested_fields(request.query_params, DishDetailSerializer)
+        queryset = await dish_queryset(request, fields)
+        if fields is None or 'reviews' in fields:
+            queryset = queryset.prefetch_related(latest_reviews_prefetch())
+        dish = await queryset.filter(pk=pk).afirst()
+        if dish is None:
+            return None
+        return DishDetailSerializer(dish, context={'request': request}, fields=fields).data
+
+    return await snapshot_response(request, f'detail:{pk}', build)
+
+
+async def dish_reviews(request, dish_id):
+    """GET /api/async/dishes/<dish_id>/reviews/ — те саме, що sync-версія."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    request = Request(request)
+
+    queryset = Review.objects.filter(dish_id=dish_id).select_related('user').order_by('-date')
+    paginator = DateCursorPagination()
+    # CursorPagination сам ріже queryset синхронно; async ORM теж ходить у базу
+    # через sync_to_async, тож це той самий один перехід у потік на запит
+    page = await sync_to_async(paginator.paginate_queryset)(queryset, request)
+    data = ReviewSerializer(page, many=True, context={'request': request}).data
+    return json_response(paginator.get_paginated_response(data).data)
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils.http import parse_etags
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import MenuVersion
+
+# знімки адресуються версією, тож старі просто витісняються кешем
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+class SharedVersion:
+    """
+    Лічильник в однорядковій таблиці (MenuVersion, KitchenBoardVersion): спільний для
+    всіх воркерів (кеш — LocMem, свій у кожного процесу). Прочитане значення процес
+    пам'ятає ttl_setting секунд, тож гарячий запит обходиться без SELECT, а зміну в
+    іншому воркері видно не пізніше, ніж за TTL.
+    """
+
+    def __init__(self, model, ttl_setting):
+        self.model = model
+        self.ttl_setting = ttl_setting
+        # (версія, до якого time.monotonic() вона дійсна)
+        self._memo = (None, 0.0)
+
+    def get(self):
+        version, expires = self._memo
+        if version is not None and time.monotonic() < expires:
+            return version
+
+        version = self.model.objects.filter(pk=1).values_list('version', flat=True).first()
+        if version is None:
+            version = self.model.objects.get_or_create(pk=1, defaults={'version': time.time_ns()})[0].version
+        self._memo = (version, time.monotonic() + getattr(settings, self.ttl_setting))
+        return version
+
+    def forget(self):
+        """Наступний get() перечитає версію з бази."""
+        self._memo = (None, 0.0)
+
+    def bump(self):
+        """
+        Викликати в тій самій транзакції, що й зміну даних: версія зміниться разом із
+        ними, і інший запит не збудує кеш "нової" версії зі старих рядків.
+        """
+        # max з часом, а не просто +1: після відкату транзакції чи відновлення бази
+        # номер не повториться і не підхопить чужий кеш із тим самим номером
+        updated = self.model.objects.filter(pk=1).update(
+            version=Greatest(F('version') + 1, Value(time.time_ns()))
+        )
+        # свій процес бачить зміну одразу, а після коміту — і з інших потоків
+        self.forget()
+        transaction.on_commit(self.forget)
+        if not updated:
+            self.get()
+
+
+menu_version = SharedVersion(MenuVersion, 'MENU_VERSION_TTL_SECONDS')
+
+
+def get_menu_version():
+    return menu_version.get()
+
+
+def forget_menu_version():
+    menu_version.forget()
+
+
+def bump_menu_version():
+    """Викликати в тій самій транзакції, що й зміну меню."""
+    menu_version.bump()
+
+
+def snapshot_key(request, scope):
+    # photo віддається абсолютним URL, тому хост теж частина ключа
+    params = sorted(request.query_params.lists())
+    raw = json.dumps([request.scheme, request.get_host(), scope, params])
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f'menu:snapshot:{get_menu_version()}:{digest}'
+
+
+def get_snapshot(key):
+    """Повертає (etag, data) або None."""
+    return cache.get(key)
+
+
+def store_snapshot(key, data):
+    body = json.dumps(data, cls=JSONEncoder, sort_keys=True, ensure_ascii=False)
+    etag = '"%s"' % hashlib.sha1(body.encode()).hexdigest()
+    # ReturnList/ReturnDict тягнуть за собою серіалізатор — кешуємо чисті дані
+    data = list(data) if isinstance(data, list) else dict(data)
+    snapshot = (etag, data)
+    cache.set(key, snapshot, timeout=SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    # If-None-Match порівнюється слабко, тож W/"..." теж рахується
+    etags = [e[2:] if e.startswith('W/') else e for e in parse_etags(header)]
+    return '*' in etags or etag in etags
@@ -0,0 +1,104 @@
+"""
+Читання — з репліки, запис — у primary.
+
+PrimaryReplicaRouter вмикається, коли в DATABASES є аліас 'replica'. На репліку йдуть
+лише читання з GET/HEAD-запитів, які ReadYourWritesMiddleware позначив безпечними:
+запит, що пише (POST/PUT/PATCH/DELETE), читає з primary цілком, і ще
+REPLICA_STICKY_SECONDS після нього той самий клієнт теж читає з primary — бачить
+щойно записане, навіть якщо репліка відстає.
+
+"Нещодавно писав" несе сам клієнт: підписана мітка часу в cookie (браузер на тому ж
+домені) і в заголовку X-DB-Primary (SPA з іншого origin повертає його сама). Стан
+не лежить у кеші процесу, тож наступний GET може потрапити в будь-який воркер.
+"""
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+STICKY_COOKIE = 'db_primary'
+STICKY_HEADER = 'X-DB-Primary'
+_signer = signing.TimestampSigner(salt='menu_api.db_routing.sticky')
+
+# поза HTTP-запитами (команди, воркери) читаємо з primary
+_use_replica = ContextVar('db_use_replica', default=False)
+
+
+def has_replica():
+    return REPLICA in settings.DATABASES
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and has_replica():
+            return REPLICA
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # обидві бази містять ті самі таблиці
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # репліка — копія primary (див. sync_replica), мігрується лише primary
+        return db == PRIMARY
+
+
+class ReadYourWritesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def recently_wrote(self, request):
+        token = request.COOKIES.get(STICKY_COOKIE) or request.headers.get(STICKY_HEADER)
+        if not token:
+            return False
+        try:
+            _signer.unsign(token, max_age=self.sticky_seconds)
+        except signing.BadSignature:
+            # і підробка, і прострочена мітка (SignatureExpired)
+            return False
+        return True
+
+    def use_replica(self, request):
+        return has_replica() and request.method in SAFE_METHODS and not self.recently_wrote(request)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _use_replica.set(self.use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        self.remember(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = _use_replica.set(self.use_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+        self.remember(request, response)
+        return response
+
+    def remember(self, request, response):
+        if has_replica() and request.method not in SAFE_METHODS:
+            token = _signer.sign('1')
+            response.set_cookie(
+                STICKY_COOKIE, token, max_age=self.sticky_seconds, httponly=True, samesite='Lax',
+            )
+            response[STICKY_HEADER] = token
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .models import OrderEvent
+
+ORDER_CREATED = 'order.created'
+ORDER_STATUS = 'order.status'
+
+# як часто стрім перевіряє нові події та як часто шле keep-alive
+POLL_INTERVAL = 1.0
+HEARTBEAT_INTERVAL = 15.0
+RETRY_MS = 3000
+BATCH_SIZE = 100
+# старі події чистимо раз на стільки нових, а не на кожен publish
+PRUNE_EVERY = 1000
+
+# короткоживучий підписаний токен для ?stream_token= (EventSource не шле заголовків)
+_stream_signer = signing.TimestampSigner(salt='menu_api.events.stream')
+
+
+def publish(kind, payloads):
+    """Пише події в журнал; викликати в тій самій транзакції, що й зміну замовлення."""
+    events = OrderEvent.objects.bulk_create(
+        [OrderEvent(order_id=payload['id'], kind=kind, payload=payload) for payload in payloads]
+    )
+    if events and events[-1].id is not None and events[-1].id % PRUNE_EVERY < len(events):
+        prune()
+
+
+def prune(now=None):
+    """Видаляє події, старші за ORDER_EVENT_RETENTION_HOURS; повертає кількість."""
+    cutoff = (now or timezone.now()) - timedelta(hours=settings.ORDER_EVENT_RETENTION_HOURS)
+    deleted, _ = OrderEvent.objects.filter(date__lt=cutoff).delete()
+    return deleted
+
+
+def issue_stream_token(user):
+    return _stream_signer.sign(str(user.pk))
+
+
+async def stream_token_user(value):
+    try:
+        pk = _stream_signer.unsign(value, max_age=settings.ORDER_STREAM_TOKEN_SECONDS)
+    except signing.BadSignature:
+        # і підробка, і прострочений токен (SignatureExpired)
+        return None
+    return await User.objects.filter(pk=pk, is_active=True).afirst()
+
+
+def format_event(event):
+    data = json.dumps(event.payload, ensure_ascii=False)
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n"
+
+
+async def stream_user(request):
+    # EventSource не вміє слати заголовки: замість довгоживучого API-токена в URL
+    # (він осідає в логах) береться ?stream_token= з POST /api/orders/events/token/
+    stream_token = request.GET.get('stream_token')
+    if stream_token:
+        return await stream_token_user(stream_token)
+
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Token '):
+        key = header[len('Token '):].strip()
+        cached = token_cache.get(key)
+        if cached is None:
+            token = await Token.objects.select_related('user').filter(key=key).afirst()
+            if token is None:
+                return None
+            token_cache.set(key, token.user, token)
+            cached = token.user, token
+        user, _ = cached
+        return user if user.is_active else None
+    return await request.auser()
+
+
+def last_event_id(request):
+    raw = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+async def fetch_after(last_id):
+    return [event async for event in OrderEvent.objects.filter(id__gt=last_id).order_by('id')[:BATCH_SIZE]]
+
+
+async def live_stream(last_id):
+    yield f"retry: {RETRY_MS}\n\n"
+    idle = 0.0
+    while True:
+        events = await fetch_after(last_id)
+        for event in events:
+            last_id = event.id
+            yield format_event(event)
+
+        if len(events) == BATCH_SIZE:
+            continue
+
+        await asyncio.sleep(POLL_INTERVAL)
+        idle = 0.0 if events else idle + POLL_INTERVAL
+        if idle >= HEARTBEAT_INTERVAL:
+            idle = 0.0
+            yield ": ping\n\n"
+
+
+async def order_events(request):
+    """
+    GET /api/orders/events/  (text/event-stream, тільки для staff)
+    Віддає події order.created / order.status після Last-Event-ID
+    (або ?last_event_id=); без курсора — лише нові події.
+    """
+    user = await stream_user(request)
+    if user is None or not user.is_staff:
+        return JsonResponse({"detail": "Доступ лише для персоналу."}, status=403)
+
+    last_id = last_event_id(request)
+    if last_id is None:
+        latest = await OrderEvent.objects.order_by('-id').afirst()
+        last_id = latest.id if latest else 0
+
+    if isinstance(request, ASGIRequest):
+        content = live_stream(last_id)
+    else:
+        # під WSGI нескінченний стрім тримав би воркер: віддаємо накопичене
+        # і закриваємо, EventSource перепідключиться з Last-Event-ID
+        content = [f"retry: {RETRY_MS}\n\n"] + [format_event(event) for event in await fetch_after(last_id)]
+
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
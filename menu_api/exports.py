@@ -0,0 +1,111 @@
+import csv
+import json
+from itertools import groupby
+
+from rest_framework.renderers import BaseRenderer
+
+from .models import Order, OrderItem
+
+CHUNK_SIZE = 500
+
+CSV_HEADER = (
+    'order_id', 'date', 'status', 'user_id', 'username', 'order_sums',
+    'dish_id', 'dish_name', 'quantity', 'price',
+)
+
+
+class _Echo:
+    """Псевдобуфер для csv.writer: повертає рядок замість запису у файл."""
+
+    def write(self, value):
+        return value
+
+
+def iter_orders(date_from=None, date_to=None, chunk_size=CHUNK_SIZE):
+    """
+    Видає замовлення разом з позиціями порціями по chunk_size.
+    На порцію — два запити (замовлення за keyset по id і всі їхні позиції),
+    моделі не створюються, тож пам'ять не росте з обсягом історії.
+    """
+    orders = Order.objects.order_by('id')
+    if date_from:
+        orders = orders.filter(date__date__gte=date_from)
+    if date_to:
+        orders = orders.filter(date__date__lte=date_to)
+    orders = orders.values('id', 'date', 'status', 'user_id', 'user__username', 'sums')
+
+    last_id = 0
+    while True:
+        chunk = list(orders.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        last_id = chunk[-1]['id']
+
+        items = (
+            OrderItem.objects.filter(order_id__in=[order['id'] for order in chunk])
+            .order_by('order_id', 'id')
+            .values('order_id', 'dish_id', 'dish__name', 'quantity', 'price')
+        )
+        items_by_order = {order_id: list(rows) for order_id, rows in groupby(items, key=lambda row: row['order_id'])}
+        for order in chunk:
+            yield order, items_by_order.get(order['id'], [])
+
+
+def csv_lines(orders):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for order, items in orders:
+        head = (
+            order['id'], order['date'].isoformat(), order['status'],
+            order['user_id'] or '', order['user__username'] or '', order['sums'],
+        )
+        if not items:
+            yield writer.writerow(head + ('', '', '', ''))
+        for item in items:
+            yield writer.writerow(head + (item['dish_id'], item['dish__name'], item['quantity'], item['price']))
+
+
+def ndjson_lines(orders):
+    for order, items in orders:
+        yield json.dumps({
+            'id': order['id'],
+            'date': order['date'].isoformat(),
+            'status': order['status'],
+            'user_id': order['user_id'],
+            'username': order['user__username'],
+            'sums': str(order['sums']),
+            'items': [
+                {
+                    'dish': item['dish_id'],
+                    'dish_name': item['dish__name'],
+                    'quantity': item['quantity'],
+                    'price': str(item['price']),
+                }
+                for item in items
+            ],
+        }, ensure_ascii=False) + '\n'
+
+
+WRITERS = {
+    'csv': csv_lines,
+    'ndjson': ndjson_lines,
+}
+
+
+class _ExportRenderer(BaseRenderer):
+    # сам експорт стрімиться StreamingHttpResponse; рендерер потрібен для
+    # узгодження формату (?format= / Accept) і для тіла помилок
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
@@ -0,0 +1,140 @@
+"""
+Idempotency-Key для POST /api/orders/ і POST /api/orders/batch/.
+
+Кіоски й мобільні клієнти на нестабільному зв'язку повторюють запит з тим самим
+ключем. Ключ займає той, чий INSERT рядка IdempotencyKey пройшов першим (slot —
+первинний ключ), тож дублікат в іншому воркері бачить той самий рядок. Успішна
+відповідь зберігається в рядку, і повтор отримує її ж — без другого INSERT в
+Order/OrderItem. Поки перший запит ще виконується, дублікат коротко чекає
+(IDEMPOTENCY_WAIT_SECONDS) і отримує 409 з Retry-After, а не тримає воркер.
+
+Завершені відповіді незмінні, тож процес ще й пам'ятає їх у кеші 'idempotency':
+повтор у тому самому воркері не йде в базу.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+CACHE_ALIAS = 'idempotency'
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# якщо воркер упав посеред запиту, ключ звільниться сам
+IN_FLIGHT_TIMEOUT = 60
+POLL_INTERVAL = 0.05
+
+
+def slot_key(request, key):
+    # той самий ключ від різних користувачів чи для різних ендпоінтів — різні записи
+    user = request.user.pk if request.user.is_authenticated else None
+    return hashlib.sha256(f'{request.path}\0{user}\0{key}'.encode()).hexdigest()
+
+
+def fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def replay(entry):
+    return Response(entry.response, status=entry.status_code, headers={'Idempotent-Replayed': 'true'})
+
+
+def claim(slot, body):
+    """
+    Займає ключ унікальним INSERT. None — ключ наш; інакше рядок, що його тримає,
+    або False, якщо той рядок уже встигли видалити.
+    """
+    try:
+        with transaction.atomic():
+            IdempotencyKey.objects.create(slot=slot, fingerprint=body)
+        return None
+    except IntegrityError:
+        return IdempotencyKey.objects.filter(slot=slot).first() or False
+
+
+def is_stale(entry, now):
+    if entry.status_code is None:
+        return entry.date < now - timedelta(seconds=IN_FLIGHT_TIMEOUT)
+    return entry.date < now - timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS)
+
+
+def prune(now=None):
+    """Видаляє ключі, старші за IDEMPOTENCY_KEY_RETENTION_HOURS; повертає кількість."""
+    cutoff = (now or timezone.now()) - timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS)
+    deleted, _ = IdempotencyKey.objects.filter(date__lt=cutoff).delete()
+    return deleted
+
+
+def idempotent(view_method):
+    """
+    Декоратор методу ViewSet. Без заголовка Idempotency-Key запит виконується як звичайно.
+    Той самий ключ з іншим тілом — 422; дублікат, що не дочекався першого запиту, — 409.
+    Помилки (валідація, 5xx) не зберігаються: повтор виконається знову.
+    """
+    @wraps(view_method)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return view_method(view, request, *args, **kwargs)
+        if not key.strip() or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'detail': f'{HEADER} має бути непорожнім і не довшим за {MAX_KEY_LENGTH} символів.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        cache = caches[CACHE_ALIAS]
+        slot, body = slot_key(request, key), fingerprint(request)
+        done = cache.get(slot)
+        if done is not None and done.fingerprint == body:
+            return replay(done)
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while (entry := claim(slot, body)) is not None:
+            if entry is False:
+                # власник ключа завершився помилкою — пробуємо зайняти ключ самі
+                continue
+            if is_stale(entry, timezone.now()):
+                # видаляємо саме цей рядок: ключ, який тим часом зайняв інший запит, не чіпаємо
+                IdempotencyKey.objects.filter(slot=slot, date=entry.date, status_code=entry.status_code).delete()
+                continue
+            if entry.fingerprint != body:
+                return Response(
+                    {'detail': f'{HEADER} уже використано з іншим тілом запиту.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            if entry.status_code is not None:
+                cache.set(slot, entry)
+                return replay(entry)
+            if time.monotonic() >= deadline:
+                return Response(
+                    {'detail': f'Запит з цим {HEADER} ще виконується.'},
+                    status=status.HTTP_409_CONFLICT, headers={'Retry-After': '1'},
+                )
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            response = view_method(view, request, *args, **kwargs)
+        except BaseException:
+            IdempotencyKey.objects.filter(slot=slot).delete()
+            raise
+        if status.is_success(response.status_code):
+            IdempotencyKey.objects.filter(slot=slot).update(status_code=response.status_code, response=response.data)
+            cache.set(slot, IdempotencyKey(
+                slot=slot, fingerprint=body, status_code=response.status_code, response=response.data,
+            ))
+        else:
+            IdempotencyKey.objects.filter(slot=slot).delete()
+        return response
+
+    return wrapper
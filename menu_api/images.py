@@ -0,0 +1,103 @@
+"""
+Варіанти фото страв (thumbnail / card / detail) у WebP і JPEG.
+
+generate_variants виконується в окремому процесі, тому модуль не
+імпортує Django на верхньому рівні: воркеру достатньо PIL і шляхів.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from PIL import Image, ImageOps
+
+VARIANT_DIR = 'dishes_photos/variants'
+# ширина кожного варіанта; менші оригінали не збільшуємо
+VARIANTS = {
+    'thumbnail': 160,
+    'card': 480,
+    'detail': 1200,
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def generate_variants(media_root, name):
+    """
+    Створює всі варіанти для MEDIA_ROOT/name і повертає мапу
+    {'source': name, 'thumbnail': {'webp': '...', 'jpeg': '...'}, ...}.
+    Імена містять хеш вмісту, тож файли незмінні й готові варіанти не перегенеровуються.
+    """
+    source = os.path.join(media_root, name)
+    digest = content_hash(source)
+    os.makedirs(os.path.join(media_root, VARIANT_DIR), exist_ok=True)
+
+    result = {'source': name}
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        for variant, width in VARIANTS.items():
+            image = original.copy()
+            image.thumbnail((width, width * 4), Image.LANCZOS)
+            result[variant] = {}
+            for ext, (image_format, options) in FORMATS.items():
+                relative = f'{VARIANT_DIR}/{digest}-{variant}.{ext}'
+                target = os.path.join(media_root, relative)
+                if not os.path.exists(target):
+                    converted = image.convert('RGB') if image_format == 'JPEG' else image
+                    # пишемо в тимчасовий файл і перейменовуємо, щоб не віддати недописаний
+                    converted.save(target + '.tmp', image_format, **options)
+                    os.replace(target + '.tmp', target)
+                result[variant][ext] = relative
+    return result
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, а не fork: сервер багатопотоковий
+            _pool = ProcessPoolExecutor(max_workers=2, mp_context=get_context('spawn'))
+        return _pool
+
+
+def schedule_variants(dish_id, media_root, name):
+    """Ставить генерацію у пул процесів; результат пишеться в Dish.photo_variants."""
+    future = get_pool().submit(generate_variants, media_root, name)
+    future.add_done_callback(lambda done: _store_variants(dish_id, name, done))
+    return future
+
+
+def _store_variants(dish_id, name, future):
+    from django.db import connection
+
+    from . import cache as menu_cache
+    from .models import Dish
+
+    if future.exception() is not None:
+        logger.error("Не вдалося згенерувати варіанти фото %s", name, exc_info=future.exception())
+        return
+    try:
+        # фото могли замінити, поки ми працювали — тоді результат уже не потрібен
+        updated = Dish.objects.filter(pk=dish_id, photo=name).update(photo_variants=future.result())
+        if updated:
+            menu_cache.bump_menu_version()
+    finally:
+        # колбек виконується в службовому потоці пулу зі своїм з'єднанням
+        connection.close()
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.db.models import Count, F, Min, Q, Sum, Window
+from django.utils import timezone
+
+from .cache import SharedVersion
+from .models import KitchenBoardVersion, OrderItem
+
+OPEN_STATUSES = ('NEW', 'IN_PROGRESS')
+
+# страховка на зміни повз invalidate() (адмінка, DELETE замовлення)
+BOARD_TIMEOUT = 30
+
+board_version = SharedVersion(KitchenBoardVersion, 'KITCHEN_BOARD_VERSION_TTL_SECONDS')
+
+
+def get_version():
+    return board_version.get()
+
+
+def invalidate():
+    """Викликати в транзакції, що створює замовлення або змінює статус."""
+    board_version.bump()
+
+
+def build_board():
+    """
+    Один запит: рядки відкритих позицій, а підсумки по страві рахує SQL віконними
+    агрегатами (PARTITION BY dish_id) — GROUP BY згорнув би рядки, з яких беремо
+    список замовлень. Позиція унікальна в межах (order, dish), тож рядків не більше,
+    ніж позицій у відкритих замовленнях.
+    """
+    per_dish = dict(partition_by=F('dish_id'))
+    rows = (
+        OrderItem.objects.filter(order__status__in=OPEN_STATUSES)
+        .values('order_id', 'order__date', 'order__status', 'dish_id', 'dish__name')
+        .annotate(
+            total=Window(Sum('quantity'), **per_dish),
+            new=Window(Sum('quantity', filter=Q(order__status='NEW')), **per_dish),
+            orders=Window(Count('id'), **per_dish),
+            oldest_order_date=Window(Min('order__date'), **per_dish),
+        )
+        .order_by('order__date', 'order_id')
+    )
+
+    dishes, orders = {}, {}
+    for row in rows:
+        orders.setdefault(row['order_id'], {
+            'id': row['order_id'], 'status': row['order__status'], 'date': row['order__date'],
+        })
+        if row['dish_id'] not in dishes:
+            new = row['new'] or 0
+            dishes[row['dish_id']] = {
+                'dish': row['dish_id'], 'name': row['dish__name'],
+                'quantity': row['total'], 'new': new, 'in_progress': row['total'] - new,
+                'orders': row['orders'], 'oldest_order_date': row['oldest_order_date'],
+            }
+
+    return {
+        'dishes': sorted(dishes.values(), key=lambda dish: (-dish['quantity'], dish['name'])),
+        # рядки йдуть за датою замовлення, а dict зберігає порядок вставки
+        'orders': list(orders.values()),
+    }
+
+
+def get_board():
+    key = f'kitchen:board:{get_version()}'
+    board = cache.get(key)
+    if board is None:
+        board = build_board()
+        cache.set(key, board, timeout=BOARD_TIMEOUT)
+    return board
+
+
+def with_ages(board, now=None):
+    """Вік рахуємо на кожен запит, тож закешована дошка не "застигає" в часі."""
+    now = now or timezone.now()
+    return {
+        'generated_at': now,
+        'open_orders': len(board['orders']),
+        'dishes': [
+            {**dish, 'oldest_order_age_seconds': int((now - dish['oldest_order_date']).total_seconds())}
+            for dish in board['dishes']
+        ],
+        'orders': [
+            {**order, 'age_seconds': int((now - order['date']).total_seconds())}
+            for order in board['orders']
+        ],
+    }
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from menu_api import purchases
+
+
+class Command(BaseCommand):
+    help = "Заповнює PurchasedDish (право на відгук) з історії завершених замовлень."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        count = purchases.rebuild(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Записано пар користувач-страва: {count}"))
@@ -0,0 +1,101 @@
+import json
+import random
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from .loadtest import Command as LoadTestCommand
+
+# лише читання меню: саме ці ендпоінти мають async-версії під /api/async/
+READ_SCENARIOS = (
+    ('menu_browse', 50),
+    ('dish_detail', 30),
+    ('dish_reviews', 20),
+)
+
+# режим: (сервер, префікс шляхів)
+MODES = {
+    'wsgi': ('wsgi', '/api'),
+    'asgi': ('asgi', '/api'),
+    'asgi-async': ('asgi', '/api/async'),
+}
+
+
+class Command(LoadTestCommand):
+    help = (
+        "Масштабування читаючих ендпоінтів меню за кількістю з'єднань: sync views під WSGI, "
+        "sync views під ASGI і async views (/api/async/) під ASGI. Для asgi-режимів потрібен uvicorn."
+    )
+    scenarios = READ_SCENARIOS
+    count_queries = False
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--levels', default='16,64,256', help="Кількості одночасних з'єднань через кому.")
+        parser.add_argument('--modes', default=','.join(MODES), help=f"Режими через кому: {', '.join(MODES)}.")
+        parser.add_argument('--reviews', type=int, default=2000, help="Скільки відгуків засіяти.")
+        parser.set_defaults(output='concurrency-results.json', duration=5.0)
+
+    def handle(self, *args, **options):
+        self.options = options
+        levels = [int(level) for level in options['levels'].split(',')]
+        modes = options['modes'].split(',')
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Невідомі режими: {', '.join(sorted(unknown))}")
+
+        self.random = random.Random(options['seed'])
+        results = {'config': {'levels': levels, 'duration': options['duration'], 'dishes': options['dishes']}, 'modes': {}}
+        with self.temporary_database():
+            for mode in modes:
+                options['server'], self.prefix = MODES[mode]
+                host, port, stop = self.start_server()
+                try:
+                    results['modes'][mode] = {}
+                    for level in levels:
+                        options['concurrency'] = level
+                        run = self.run_load(host, port)
+                        results['modes'][mode][level] = {'total': run['total'], 'endpoints': run['endpoints']}
+                finally:
+                    stop()
+
+        Path(options['output']).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        self.report_levels(results)
+
+    def seed(self):
+        super().seed()
+        from rest_framework.authtoken.models import Token
+
+        from menu_api.models import Review
+
+        # відгуки від тих, хто справді завершив замовлення; сигнали bulk_create не шле,
+        # тож агрегати рейтингу перераховуємо командою
+        tokens_to_users = {key: user_id for user_id, key in Token.objects.values_list('user_id', 'key')}
+        pairs = self.review_pool[:self.options['reviews']]
+        Review.objects.bulk_create([
+            Review(user_id=tokens_to_users[token], dish_id=dish_id, rating=self.random.randint(1, 5), comment='ok')
+            for token, dish_id in pairs
+        ])
+        call_command('recompute_ratings', stdout=StringIO())
+
+    def build_request(self, scenario, rnd):
+        if scenario == 'menu_browse':
+            method, path, body, token = super().build_request(scenario, rnd)
+            return method, path.replace('/api', self.prefix, 1), body, token
+        dish_id = rnd.choice(self.dish_ids)
+        if scenario == 'dish_detail':
+            return 'GET', f'{self.prefix}/dishes/{dish_id}/', None, None
+        return 'GET', f'{self.prefix}/dishes/{dish_id}/reviews/', None, None
+
+    def report_levels(self, results):
+        self.stdout.write(f"{'режим':<12}{'conn':>6}{'req':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for mode, levels in results['modes'].items():
+            for level, run in levels.items():
+                total = run['total']
+                self.stdout.write(
+                    f"{mode:<12}{level:>6}{total['requests']:>8}{total['errors']:>6}{total['rps']:>9}"
+                    f"{total['p50_ms'] or '-':>9}{total['p95_ms'] or '-':>9}{total['p99_ms'] or '-':>9}"
+                )
+        self.stdout.write(f"Результати: {self.options['output']}")
@@ -0,0 +1,85 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import setup_databases, teardown_databases
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from menu_api.renderers import FastJSONRenderer
+from menu_api.serializers import DishListSerializer, dish_list_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Мікробенчмарк списку страв: DishListSerializer + JSONRenderer проти "
+        "values_list-рядків + FastJSONRenderer. Окремо міряє побудову даних і кодування JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dishes', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=30)
+
+    def handle(self, *args, dishes, repeat, **options):
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.seed(dishes)
+            self.run(repeat)
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=0)
+
+    def seed(self, count):
+        from menu_api.models import ALL_TAGS, Category, Dish
+
+        rnd = random.Random(42)
+        categories = Category.objects.bulk_create([Category(name=name) for name in ('Піца', 'Супи', 'Салати', 'Десерти')])
+        Dish.objects.bulk_create([
+            Dish(
+                name=f'Страва {i}', description='Опис', price=Decimal(rnd.randint(50, 500)),
+                category=rnd.choice(categories), tags=rnd.randint(0, ALL_TAGS),
+                photo=f'dishes_photos/{i}.jpg' if i % 2 else None,
+            )
+            for i in range(count)
+        ])
+
+    def run(self, repeat):
+        from menu_api.models import Dish
+
+        request = Request(RequestFactory().get('/api/dishes/', HTTP_HOST='localhost'))
+        queryset = Dish.objects.filter(is_available=True).select_related('category')
+
+        def serializer_path():
+            return DishListSerializer(queryset.all(), many=True, context={'request': request}).data
+
+        def fast_path():
+            return dish_list_rows(queryset.all(), request)
+
+        rows = []
+        for label, build, renderer in (
+            ('serializer + json', serializer_path, JSONRenderer()),
+            ('values + orjson', fast_path, FastJSONRenderer()),
+        ):
+            build_times, render_times, body = [], [], b''
+            for _ in range(repeat):
+                started = time.perf_counter()
+                data = build()
+                built = time.perf_counter()
+                body = renderer.render(data)
+                build_times.append(built - started)
+                render_times.append(time.perf_counter() - built)
+            rows.append((label, statistics.median(build_times) * 1000, statistics.median(render_times) * 1000, body))
+
+        self.stdout.write(f"{'шлях':<20}{'дані, мс':>10}{'JSON, мс':>10}{'разом, мс':>11}")
+        for label, build_ms, render_ms, _ in rows:
+            self.stdout.write(f"{label:<20}{build_ms:>10.2f}{render_ms:>10.2f}{build_ms + render_ms:>11.2f}")
+        (_, slow_build, slow_render, slow_body), (_, fast_build, fast_render, fast_body) = rows
+        self.stdout.write(f"Прискорення: x{(slow_build + slow_render) / (fast_build + fast_render):.1f}")
+        if slow_body != fast_body:
+            self.stdout.write(self.style.ERROR("Вивід відрізняється!"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Вивід ідентичний."))
@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from menu_api import exports
+
+
+class Command(BaseCommand):
+    help = "Потоково вивантажує замовлення з позиціями у CSV або NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(exports.WRITERS), default='csv')
+        parser.add_argument('--date-from', help="YYYY-MM-DD, включно")
+        parser.add_argument('--date-to', help="YYYY-MM-DD, включно")
+        parser.add_argument('--output', '-o', help="Файл; за замовчуванням stdout")
+        parser.add_argument('--chunk-size', type=int, default=exports.CHUNK_SIZE)
+
+    def handle(self, *args, format, date_from, date_to, output, chunk_size, **options):
+        bounds = []
+        for value in (date_from, date_to):
+            parsed = parse_date(value) if value else None
+            if value and parsed is None:
+                raise CommandError(f"Некоректна дата: {value}")
+            bounds.append(parsed)
+
+        orders = exports.iter_orders(*bounds, chunk_size=chunk_size)
+        stream = open(output, 'w', encoding='utf-8', newline='') if output else sys.stdout
+        try:
+            for line in exports.WRITERS[format](orders):
+                stream.write(line)
+        finally:
+            if output:
+                stream.close()
@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+
+from menu_api import menu_import
+
+
+class Command(BaseCommand):
+    help = "Масово імпортує меню (CSV або JSON): upsert категорій і страв за назвою."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=('csv', 'json'), help="За замовчуванням — за розширенням файлу.")
+        parser.add_argument('--dry-run', action='store_true', help="Лише показати різницю, нічого не змінювати.")
+
+    def handle(self, *args, path, format, dry_run, **options):
+        path = Path(path)
+        if not path.exists():
+            raise CommandError(f"Файл не знайдено: {path}")
+
+        fmt = format or ('json' if path.suffix.lower() == '.json' else 'csv')
+        try:
+            rows = menu_import.read_rows(path.read_bytes(), fmt)
+            report = menu_import.import_menu(rows, dry_run=dry_run)
+        except serializers.ValidationError as exc:
+            raise CommandError(json.dumps(exc.detail, ensure_ascii=False))
+
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        verb = "Буде" if dry_run else "Готово"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb}: нових {len(report['created'])}, змінених {len(report['updated'])}, без змін {report['unchanged']}"
+        ))
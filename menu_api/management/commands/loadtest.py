@@ -0,0 +1,381 @@
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+import http.client
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from urllib.parse import quote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+QUERY_HEADER = 'X-Loadtest-Queries'
+
+# сценарій: (назва, вага в суміші трафіку)
+SCENARIOS = (
+    ('menu_browse', 50),
+    ('dish_detail', 20),
+    ('order_create', 15),
+    ('review_create', 5),
+    ('staff_orders', 10),
+)
+
+
+class QueryCountMiddleware:
+    """Рахує SQL-запити запиту і віддає їх у заголовку; вмикається лише в loadtest."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = {'queries': 0}
+
+        def count(execute, sql, params, many, context):
+            counter['queries'] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            response = self.get_response(request)
+        response[QUERY_HEADER] = str(counter['queries'])
+        return response
+
+
+@contextmanager
+def test_database_name(path):
+    """
+    Ім'я тестової бази лише на час прогону. override_settings(DATABASES=...) тут не
+    допоможе: вже відкрите з'єднання тримає свій settings_dict, тож підміняємо і
+    відновлюємо саме його TEST.
+    """
+    original = connection.settings_dict.get('TEST')
+    connection.settings_dict['TEST'] = {**(original or {}), 'NAME': str(path)}
+    try:
+        yield
+    finally:
+        if original is None:
+            connection.settings_dict.pop('TEST')
+        else:
+            connection.settings_dict['TEST'] = original
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Навантажувальний бенчмарк API: засіває тимчасову БД, піднімає сервер і ганяє змішаний трафік. "
+        "Звітує p50/p95/p99, запити/с і SQL-запити на запит по кожному сценарію."
+    )
+    scenarios = SCENARIOS
+    # QueryCountMiddleware лише sync: під ASGI він змусив би async views працювати в потоці
+    count_queries = True
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dishes', type=int, default=200)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--orders', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0, help="Секунди навантаження.")
+        parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='loadtest-results.json')
+        parser.add_argument('--baseline', help="JSON попереднього прогону для порівняння.")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Допустиме погіршення p95, частка.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+
+        with self.temporary_database():
+            host, port, stop = self.start_server()
+            try:
+                results = self.run_load(host, port)
+            finally:
+                stop()
+
+        Path(options['output']).write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        self.report(results)
+        if options['baseline']:
+            self.compare(results, json.loads(Path(options['baseline']).read_text()))
+
+    # --- дані -----------------------------------------------------------
+
+    @contextmanager
+    def temporary_database(self):
+        # окрема тимчасова SQLite-база, робоча db.sqlite3 не чіпається
+        workdir = tempfile.mkdtemp(prefix='loadtest-')
+        middleware = [f'{__name__}.QueryCountMiddleware'] if self.count_queries else []
+        # генератор шле сотні замовлень з 127.0.0.1: ліміти (throttling.py) зрізали б їх у 429,
+        # а стан відер не повинен потрапити в робочий throttle.sqlite3
+        loadtest_settings = override_settings(
+            MIDDLEWARE=[*middleware, *settings.MIDDLEWARE],
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+            THROTTLE_STORE=Path(workdir) / 'throttle.sqlite3',
+        )
+        with loadtest_settings, test_database_name(Path(workdir) / 'loadtest.sqlite3'):
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                self.stdout.write("Засіваю дані...")
+                self.seed()
+                yield
+            finally:
+                connection.close()
+                teardown_databases(old_config, verbosity=0)
+
+    def seed(self):
+        from django.contrib.auth.models import User
+        from rest_framework.authtoken.models import Token
+
+        from menu_api import purchases, search
+        from menu_api.models import ALL_TAGS, Category, Dish, Order, OrderItem
+
+        options, rnd = self.options, self.random
+        categories = Category.objects.bulk_create(
+            [Category(name=name) for name in ('Піца', 'Супи', 'Салати', 'Десерти', 'Напої', 'Гаряче')]
+        )
+        Dish.objects.bulk_create([
+            Dish(
+                name=f'Страва {i}', description=f'Опис страви {i} з сиром і зеленню',
+                price=Decimal(rnd.randint(50, 500)), category=rnd.choice(categories), tags=rnd.randint(0, ALL_TAGS),
+            )
+            for i in range(options['dishes'])
+        ])
+        dishes = list(Dish.objects.values_list('id', 'price'))
+
+        User.objects.bulk_create(
+            [User(username=f'user{i}') for i in range(options['users'])]
+            + [User(username='loadtest-staff', is_staff=True)]
+        )
+        users = list(User.objects.filter(is_staff=False))
+        staff = User.objects.get(username='loadtest-staff')
+        Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users + [staff]])
+        tokens = dict(Token.objects.values_list('user_id', 'key'))
+
+        orders = Order.objects.bulk_create([
+            Order(user=rnd.choice(users), status=rnd.choice(('NEW', 'IN_PROGRESS', 'COMPLETED')))
+            for _ in range(options['orders'])
+        ])
+        items, eligible = [], set()
+        for order in orders:
+            order_items = [
+                OrderItem(order=order, dish_id=dish_id, quantity=rnd.randint(1, 3), price=price)
+                for dish_id, price in rnd.sample(dishes, rnd.randint(1, 4))
+            ]
+            order.sums = sum(item.price * item.quantity for item in order_items)
+            if order.status == 'COMPLETED':
+                eligible.update((order.user_id, item.dish_id) for item in order_items)
+            items.extend(order_items)
+        OrderItem.objects.bulk_create(items, batch_size=1000)
+        Order.objects.bulk_update(orders, ['sums'], batch_size=1000)
+        purchases.rebuild()
+        search.rebuild()
+
+        self.dish_ids = [dish_id for dish_id, _ in dishes]
+        self.categories = [category.name for category in categories]
+        self.user_tokens = [tokens[user.id] for user in users]
+        self.staff_token = tokens[staff.id]
+        # пари (токен, страва), на які ще можна лишити відгук; кожну беремо один раз
+        self.review_pool = [(tokens[user_id], dish_id) for user_id, dish_id in eligible]
+        rnd.shuffle(self.review_pool)
+        self.review_lock = threading.Lock()
+        connection.close()
+
+    # --- сервер ---------------------------------------------------------
+
+    def start_server(self):
+        if self.options['server'] == 'asgi':
+            return self.start_asgi()
+
+        from django.core.wsgi import get_wsgi_application
+
+        server = make_server(
+            '127.0.0.1', 0, get_wsgi_application(),
+            server_class=_ThreadingWSGIServer, handler_class=_QuietHandler,
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+
+        return '127.0.0.1', server.server_port, stop
+
+    def start_asgi(self):
+        try:
+            import uvicorn
+        except ImportError:
+            raise CommandError("Для --server asgi потрібен uvicorn (pip install uvicorn).")
+
+        from django.core.asgi import get_asgi_application
+
+        config = uvicorn.Config(get_asgi_application(), host='127.0.0.1', port=0, log_level='warning', lifespan='off')
+        server = uvicorn.Server(config)
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        port = server.servers[0].sockets[0].getsockname()[1]
+
+        def stop():
+            server.should_exit = True
+            thread.join(timeout=5)
+
+        return '127.0.0.1', port, stop
+
+    # --- навантаження ---------------------------------------------------
+
+    def build_request(self, scenario, rnd):
+        if scenario == 'menu_browse':
+            params = rnd.choice(['', f'?category={quote(rnd.choice(self.categories))}', f'?max_price={rnd.randint(100, 500)}'])
+            return 'GET', f'/api/dishes/{params}', None, None
+        if scenario == 'dish_detail':
+            return 'GET', f'/api/dishes/{rnd.choice(self.dish_ids)}/', None, None
+        if scenario == 'order_create':
+            items = [{'dish': dish_id, 'quantity': rnd.randint(1, 3)} for dish_id in rnd.sample(self.dish_ids, 3)]
+            return 'POST', '/api/orders/', {'items': items}, rnd.choice(self.user_tokens)
+        if scenario == 'review_create':
+            with self.review_lock:
+                pair = self.review_pool.pop() if self.review_pool else None
+            if pair is None:
+                return None
+            token, dish_id = pair
+            return 'POST', '/api/reviews/', {'dish': dish_id, 'rating': rnd.randint(1, 5), 'comment': 'ok'}, token
+        return 'GET', '/api/orders/', None, self.staff_token
+
+    def worker(self, host, port, deadline, samples, worker_id):
+        rnd = random.Random(self.options['seed'] + worker_id)
+        names = [name for name, _ in self.scenarios]
+        weights = [weight for _, weight in self.scenarios]
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        while time.perf_counter() < deadline:
+            scenario = rnd.choices(names, weights)[0]
+            spec = self.build_request(scenario, rnd)
+            if spec is None:
+                continue
+            method, path, body, token = spec
+            headers = {'Content-Type': 'application/json'}
+            if token:
+                headers['Authorization'] = f'Token {token}'
+
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=json.dumps(body) if body else None, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status, queries = response.status, response.getheader(QUERY_HEADER)
+                if response.getheader('Connection', '').lower() == 'close' or response.version == 10:
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                status, queries = 0, None
+            elapsed = time.perf_counter() - started
+            samples.append((scenario, elapsed, status, int(queries) if queries else None))
+        conn.close()
+
+    def run_load(self, host, port):
+        options = self.options
+        samples = []
+        deadline = time.perf_counter() + options['duration']
+        self.stdout.write(
+            f"Навантаження: {options['concurrency']} потоків, {options['duration']:.0f} с, сервер {options['server']}"
+        )
+        started = time.perf_counter()
+        threads = [
+            threading.Thread(target=self.worker, args=(host, port, deadline, samples, i))
+            for i in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        endpoints = {}
+        for name, _ in self.scenarios:
+            rows = [row for row in samples if row[0] == name]
+            latencies = [row[1] * 1000 for row in rows]
+            queries = [row[3] for row in rows if row[3] is not None]
+            endpoints[name] = {
+                'requests': len(rows),
+                'errors': sum(1 for row in rows if not 200 <= row[2] < 400),
+                'rps': round(len(rows) / wall, 2),
+                'p50_ms': _round(percentile(latencies, 50)),
+                'p95_ms': _round(percentile(latencies, 95)),
+                'p99_ms': _round(percentile(latencies, 99)),
+                'queries_per_request': _round(statistics.fmean(queries)) if queries else None,
+            }
+
+        latencies = [row[1] * 1000 for row in samples]
+        return {
+            'config': {key: options[key] for key in ('dishes', 'users', 'orders', 'concurrency', 'duration', 'server', 'seed')},
+            'total': {
+                'requests': len(samples),
+                'errors': sum(1 for row in samples if not 200 <= row[2] < 400),
+                'rps': round(len(samples) / wall, 2),
+                'p50_ms': _round(percentile(latencies, 50)),
+                'p95_ms': _round(percentile(latencies, 95)),
+                'p99_ms': _round(percentile(latencies, 99)),
+            },
+            'endpoints': endpoints,
+        }
+
+    # --- звіт -----------------------------------------------------------
+
+    def report(self, results):
+        header = f"{'сценарій':<15}{'req':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'sql':>7}"
+        self.stdout.write(header)
+        for name, row in results['endpoints'].items():
+            self.stdout.write(
+                f"{name:<15}{row['requests']:>7}{row['errors']:>6}{row['rps']:>9}"
+                f"{_fmt(row['p50_ms']):>9}{_fmt(row['p95_ms']):>9}{_fmt(row['p99_ms']):>9}{_fmt(row['queries_per_request']):>7}"
+            )
+        total = results['total']
+        self.stdout.write(f"Разом: {total['requests']} запитів, {total['errors']} помилок, {total['rps']} запитів/с")
+        self.stdout.write(f"Результати: {self.options['output']}")
+
+    def compare(self, results, baseline):
+        tolerance = self.options['tolerance']
+        regressions = []
+        for name, row in results['endpoints'].items():
+            base = baseline.get('endpoints', {}).get(name)
+            if not base or row['p95_ms'] is None or base.get('p95_ms') is None:
+                continue
+            if row['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+                regressions.append(f"{name}: p95 {base['p95_ms']} -> {row['p95_ms']} мс")
+            if (row['queries_per_request'] or 0) > (base.get('queries_per_request') or 0) + 0.5:
+                regressions.append(f"{name}: SQL {base['queries_per_request']} -> {row['queries_per_request']}")
+
+        if regressions:
+            raise CommandError("Регресії відносно baseline:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("Без регресій відносно baseline."))
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def _fmt(value):
+    return '-' if value is None else value
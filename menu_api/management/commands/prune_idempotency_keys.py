@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from menu_api import idempotency
+
+
+class Command(BaseCommand):
+    help = "Видаляє ключі Idempotency-Key, старші за IDEMPOTENCY_KEY_RETENTION_HOURS."
+
+    def handle(self, *args, **options):
+        deleted = idempotency.prune()
+        self.stdout.write(self.style.SUCCESS(f"Видалено ключів: {deleted}"))
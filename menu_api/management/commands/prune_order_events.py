@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from menu_api import events
+
+
+class Command(BaseCommand):
+    help = "Видаляє події SSE-стріму, старші за ORDER_EVENT_RETENTION_HOURS."
+
+    def handle(self, *args, **options):
+        deleted = events.prune()
+        self.stdout.write(self.style.SUCCESS(f"Видалено подій: {deleted}"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from menu_api import analytics
+
+
+class Command(BaseCommand):
+    help = "Перераховує денні підсумки продажів (DailyDishSales) з історії завершених замовлень."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date-from', help="YYYY-MM-DD, включно")
+        parser.add_argument('--date-to', help="YYYY-MM-DD, включно")
+
+    def handle(self, *args, date_from, date_to, **options):
+        bounds = []
+        for value in (date_from, date_to):
+            parsed = parse_date(value) if value else None
+            if value and parsed is None:
+                raise CommandError(f"Некоректна дата: {value}")
+            bounds.append(parsed)
+
+        count = analytics.rebuild(*bounds)
+
+        self.stdout.write(self.style.SUCCESS(f"Записано підсумків: {count}"))
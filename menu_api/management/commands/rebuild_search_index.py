@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from menu_api import search
+
+
+class Command(BaseCommand):
+    help = "Перебудовує FTS5-індекс пошуку страв (назва + опис)."
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError("Повнотекстовий індекс підтримується лише на SQLite (FTS5).")
+
+        with transaction.atomic():
+            search.create_index()
+            count = search.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f"Проіндексовано страв: {count}"))
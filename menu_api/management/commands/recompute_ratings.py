@@ -0,0 +1,42 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from menu_api import cache as menu_cache
+from menu_api.models import Dish, Review
+
+
+def compute_rating(count, total):
+    if not count:
+        return Decimal('0.00')
+    return (Decimal(total) / count).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+class Command(BaseCommand):
+    help = "Перераховує review_count, rating_sum і rating усіх страв одним груповим запитом."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        with transaction.atomic():
+            totals = {
+                row['dish']: (row['count'], row['total'])
+                for row in Review.objects.values('dish').annotate(count=Count('id'), total=Sum('rating'))
+            }
+
+            changed = []
+            for dish in Dish.objects.only('id', 'review_count', 'rating_sum', 'rating').iterator():
+                count, total = totals.get(dish.id, (0, 0))
+                rating = compute_rating(count, total)
+                if (dish.review_count, dish.rating_sum, dish.rating) != (count, total, rating):
+                    dish.review_count, dish.rating_sum, dish.rating = count, total, rating
+                    changed.append(dish)
+
+            Dish.objects.bulk_update(changed, ['review_count', 'rating_sum', 'rating'], batch_size=batch_size)
+
+        if changed:
+            menu_cache.bump_menu_version()
+        self.stdout.write(self.style.SUCCESS(f"Оновлено страв: {len(changed)}"))
@@ -0,0 +1,45 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from menu_api import cache as menu_cache
+from menu_api import images
+from menu_api.models import Dish
+
+
+class Command(BaseCommand):
+    help = "Генерує варіанти фото (thumbnail/card/detail, WebP+JPEG) для всіх страв на всіх ядрах."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--force', action='store_true', help="Перегенерувати навіть актуальні варіанти.")
+
+    def handle(self, *args, workers, force, **options):
+        dishes = [
+            dish for dish in Dish.objects.exclude(photo='').exclude(photo__isnull=True).only('id', 'photo', 'photo_variants')
+            if force or dish.photo_variants.get('source') != dish.photo.name
+        ]
+        if not dishes:
+            self.stdout.write("Усі варіанти актуальні.")
+            return
+
+        media_root = str(settings.MEDIA_ROOT)
+        updated, failed = [], 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(images.generate_variants, media_root, dish.photo.name): dish for dish in dishes}
+            for future in as_completed(futures):
+                dish = futures[future]
+                try:
+                    dish.photo_variants = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{dish.photo.name}: {exc}")
+                    continue
+                updated.append(dish)
+
+        Dish.objects.bulk_update(updated, ['photo_variants'], batch_size=500)
+        if updated:
+            menu_cache.bump_menu_version()
+        self.stdout.write(self.style.SUCCESS(f"Оновлено страв: {len(updated)}, помилок: {failed}"))
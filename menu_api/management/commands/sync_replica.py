@@ -0,0 +1,30 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from menu_api.db_routing import PRIMARY, REPLICA, has_replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Копіює primary SQLite у файл репліки (sqlite3 backup API, без зупинки запису). "
+        "Для локальної перевірки маршрутизації читань; у продакшені репліку веде сама СУБД."
+    )
+
+    def handle(self, *args, **options):
+        if not has_replica():
+            raise CommandError("Репліку не налаштовано: задайте DATABASE_REPLICA_NAME.")
+        primary, replica = settings.DATABASES[PRIMARY], settings.DATABASES[REPLICA]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3' or replica['ENGINE'] != primary['ENGINE']:
+            raise CommandError("sync_replica працює лише з SQLite.")
+
+        source = sqlite3.connect(primary['NAME'])
+        target = sqlite3.connect(replica['NAME'])
+        try:
+            with target:
+                source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"Репліку оновлено: {replica['NAME']}"))
@@ -0,0 +1,146 @@
+"""
+Нечіткий пошук страви за фразою голосового асистента ("додай дві піци маргарита").
+
+Індекс тримається в пам'яті процесу і перебудовується, коли змінюється версія
+меню (MenuVersion у базі — спільна для всіх воркерів, див. cache.py). Ранжування
+повторює bestDishMatch із фронтенду: точний збіг назви, потім входження, потім
+схожість токенів (назва / назва+опис+теги) і символьних триграм назви.
+"""
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from . import cache as menu_cache
+from .models import ALL_TAGS, Dish
+from .serializers import DISH_LIST_COLUMNS, TAG_LABELS, dish_list_row
+
+# нижче цього порогу фразу вважаємо нерозпізнаною (як у bestDishMatch)
+MIN_SCORE = 0.34
+EXACT_SCORE = 1.0
+SUBSTRING_SCORE = 0.9
+
+# розпізнавання мовлення інколи віддає російські літери чи ґ без діакритики
+LETTER_MAP = str.maketrans({'ё': 'е', 'э': 'е', 'ы': 'и', 'ъ': '', 'ґ': 'г'})
+APOSTROPHES = re.compile(r"['’ʼ`´]")
+NON_WORD = re.compile(r'[^\w\s]|_')
+
+# закінчення відмінків іменників і прикметників, довші — першими
+ENDINGS = (
+    'ами', 'ями', 'ові', 'еві', 'ого', 'ому', 'ими', 'іми',
+    'ах', 'ях', 'ам', 'ям', 'ом', 'ем', 'ою', 'ею', 'ів', 'їв', 'ей', 'ий', 'ій', 'ої',
+    'а', 'я', 'у', 'ю', 'і', 'ї', 'и', 'о', 'е', 'ь',
+)
+MIN_STEM = 3
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFD', (text or '').lower())
+    # наголоси (комбінуючий акут) прибираємо, але й/ї збираємо назад через NFC
+    text = unicodedata.normalize('NFC', text.replace('\u0301', ''))
+    text = APOSTROPHES.sub('', text.translate(LETTER_MAP))
+    return ' '.join(NON_WORD.sub(' ', text).split())
+
+
+def stem(token):
+    for ending in ENDINGS:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM:
+            return token[:-len(ending)]
+    return token
+
+
+def stems(text):
+    return {stem(token) for token in text.split()}
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def dice(a, b):
+    total = len(a) + len(b)
+    return 2 * len(a & b) / total if total else 0.0
+
+
+class DishIndex:
+    def __init__(self, rows):
+        self.rows = {}
+        self.names = {}
+        self.name_stems = {}
+        self.hay_stems = {}
+        self.name_trigrams = {}
+        self.postings = defaultdict(set)
+
+        for row in rows:
+            dish_id, name, description, tags = row[0], row[1], row[-2], row[-1]
+            self.rows[dish_id] = row[:-2]
+            name = normalize(name)
+            self.names[dish_id] = name
+            self.name_stems[dish_id] = stems(name)
+            self.hay_stems[dish_id] = stems(normalize(f"{name} {description} {' '.join(TAG_LABELS[tags & ALL_TAGS])}"))
+            self.name_trigrams[dish_id] = trigrams(name)
+            for key in self.name_trigrams[dish_id] | self.hay_stems[dish_id]:
+                self.postings[key].add(dish_id)
+
+    @classmethod
+    def build(cls):
+        columns = DISH_LIST_COLUMNS + ('description', 'tags')
+        return cls(Dish.objects.filter(is_available=True).values_list(*columns))
+
+    def score(self, dish_id, query, query_stems, query_trigrams):
+        name = self.names[dish_id]
+        if name == query:
+            return EXACT_SCORE, 'exact'
+        if query in name or name in query:
+            return SUBSTRING_SCORE, 'substring'
+        return max(
+            jaccard(query_stems, self.name_stems[dish_id]),
+            jaccard(query_stems, self.hay_stems[dish_id]),
+            dice(query_trigrams, self.name_trigrams[dish_id]),
+        ), 'fuzzy'
+
+    def search(self, phrase, limit=5):
+        """[(score, kind, dish_id)] від найкращого; лише кандидати зі спільними триграмами/основами."""
+        query = normalize(phrase)
+        if not query:
+            return []
+        query_stems, query_trigrams = stems(query), trigrams(query)
+        candidates = set().union(*(self.postings.get(key, ()) for key in query_trigrams | query_stems))
+
+        results = []
+        for dish_id in candidates:
+            score, kind = self.score(dish_id, query, query_stems, query_trigrams)
+            if score >= MIN_SCORE:
+                results.append((round(score, 3), kind, dish_id))
+        # рівні бали — коротша назва точніша
+        results.sort(key=lambda result: (-result[0], len(self.names[result[2]]), result[2]))
+        return results[:limit]
+
+
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def get_index():
+    global _index, _index_version
+    version = menu_cache.get_menu_version()
+    if _index_version != version:
+        with _lock:
+            if _index_version != version:
+                _index, _index_version = DishIndex.build(), version
+    return _index
+
+
+def match(phrase, limit=5, request=None):
+    index = get_index()
+    return [
+        {'score': score, 'match': kind, 'dish': dish_list_row(index.rows[dish_id], request)}
+        for score, kind, dish_id in index.search(phrase, limit)
+    ]
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+
+from . import cache as menu_cache
+from . import search
+from .models import Category, Dish
+from .serializers import MenuImportRowSerializer
+
+DISH_FIELDS = ('description', 'price', 'category', 'is_available', 'tags')
+
+
+def read_rows(content, fmt):
+    """Розбирає CSV (із заголовком) або JSON-список об'єктів у список dict."""
+    try:
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        if fmt == 'json':
+            rows = json.loads(content)
+        else:
+            rows = list(csv.DictReader(io.StringIO(content)))
+    except (UnicodeDecodeError, ValueError, csv.Error) as exc:
+        # JSONDecodeError — підклас ValueError; битий файл — це 400, а не 500
+        raise serializers.ValidationError({"detail": f"Не вдалося прочитати файл ({fmt}): {exc}"})
+    if fmt == 'json' and not isinstance(rows, list):
+        raise serializers.ValidationError({"detail": "JSON має бути списком страв."})
+    return rows
+
+
+def validate_rows(rows):
+    serializer = MenuImportRowSerializer(data=rows, many=True)
+    serializer.is_valid(raise_exception=True)
+
+    seen, duplicates = set(), set()
+    for row in serializer.validated_data:
+        if row['name'] in seen:
+            duplicates.add(row['name'])
+        seen.add(row['name'])
+    if duplicates:
+        raise serializers.ValidationError({"detail": f"Страви повторюються: {', '.join(sorted(duplicates))}"})
+    return serializer.validated_data
+
+
+def diff(rows):
+    """Порівнює файл з базою одним запитом: що створиться, що й як зміниться."""
+    existing = {
+        dish['name']: {**dish, 'category': dish['category__name']}
+        for dish in Dish.objects.filter(name__in=[row['name'] for row in rows]).values(
+            'name', 'description', 'price', 'is_available', 'tags', 'category__name'
+        )
+    }
+
+    created, updated, unchanged = [], {}, 0
+    for row in rows:
+        current = existing.get(row['name'])
+        if current is None:
+            created.append(row['name'])
+            continue
+        changed = [field for field in DISH_FIELDS if current[field] != row[field]]
+        if changed:
+            updated[row['name']] = changed
+        else:
+            unchanged += 1
+    return {'created': created, 'updated': updated, 'unchanged': unchanged}
+
+
+def import_menu(rows, dry_run=False):
+    """
+    Upsert категорій і страв за назвою кількома set-based запитами.
+    Повертає diff; при dry_run база не змінюється.
+    """
+    rows = validate_rows(rows)
+    report = diff(rows)
+    report['dry_run'] = dry_run
+    changed_names = set(report['created']) | set(report['updated'])
+    if dry_run or not changed_names:
+        return report
+
+    changed_rows = [row for row in rows if row['name'] in changed_names]
+    with transaction.atomic():
+        category_names = {row['category'] for row in changed_rows}
+        Category.objects.bulk_create(
+            [Category(name=name) for name in category_names], ignore_conflicts=True
+        )
+        categories = dict(Category.objects.filter(name__in=category_names).values_list('name', 'id'))
+
+        Dish.objects.bulk_create(
+            [
+                Dish(
+                    name=row['name'], description=row['description'], price=row['price'],
+                    category_id=categories[row['category']], is_available=row['is_available'], tags=row['tags'],
+                )
+                for row in changed_rows
+            ],
+            update_conflicts=True,
+            unique_fields=['name'],
+            update_fields=['description', 'price', 'category', 'is_available', 'tags'],
+        )
+
+        # bulk-операції не шлють сигналів: індекс і версію меню оновлюємо самі, один раз
+        search.reindex(Dish.objects.filter(name__in=changed_names).values_list('id', flat=True))
+        menu_cache.bump_menu_version()
+
+    return report
@@ -0,0 +1,277 @@
+"""
+Метрики запитів у пам'яті процесу: час, SQL, розмір відповіді, рендеринг.
+
+PerformanceMiddleware збирає їх по маршрутах (url_name: dish-list,
+order-status-update, ...), throttling.py — рішення лімітів, metrics_view віддає
+у форматі Prometheus.
+
+SQL рахує обгортка, яку кожне з'єднання (усі аліаси, зокрема replica) отримує
+при створенні; поточний Sample вона бере з ContextVar, а той переходить і в
+потоки sync_to_async, тож async views теж мають лічильник SQL.
+"""
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+logger = logging.getLogger('menu_api.slow_requests')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# скільки SQL тримаємо на запит для slow-логу
+SLOW_LOG_MAX_QUERIES = 50
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RouteStats:
+    __slots__ = ('duration', 'queries', 'sql_seconds', 'render_seconds', 'response_bytes', 'statuses')
+
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = 0.0
+        self.render_seconds = 0.0
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class Registry:
+    def __init__(self):
+        self._routes = {}
+        self._throttles = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, method, status, sample):
+        key = (route, method)
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = RouteStats()
+            stats.duration.observe(sample.duration)
+            stats.queries.observe(sample.queries)
+            stats.sql_seconds += sample.sql_seconds
+            stats.render_seconds += sample.render_seconds
+            stats.response_bytes += sample.response_bytes
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def record_throttle(self, scope, allowed):
+        key = (scope, 'allowed' if allowed else 'rejected')
+        with self._lock:
+            self._throttles[key] = self._throttles.get(key, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+            self._throttles.clear()
+
+    def render(self):
+        lines = []
+        with self._lock:
+            routes = sorted(self._routes.items())
+            _histogram(lines, 'http_request_duration_seconds', "Request wall time.",
+                       [(labels, stats.duration) for labels, stats in routes])
+            _histogram(lines, 'http_request_sql_queries', "SQL queries per request.",
+                       [(labels, stats.queries) for labels, stats in routes])
+            for name, help_text, attr in (
+                ('http_request_sql_seconds_total', "Time spent in SQL.", 'sql_seconds'),
+                ('http_response_render_seconds_total', "Time spent rendering DRF responses.", 'render_seconds'),
+                ('http_response_size_bytes_total', "Response body bytes (non-streaming).", 'response_bytes'),
+            ):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, stats in routes:
+                    lines.append(f'{name}{{{_labels(labels)}}} {getattr(stats, attr)}')
+            lines.append('# HELP http_responses_total Responses by status code.')
+            lines.append('# TYPE http_responses_total counter')
+            for labels, stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'http_responses_total{{{_labels(labels)},status="{status}"}} {count}')
+            lines.append('# HELP throttle_decisions_total Token-bucket checks by scope (view.ip|user).')
+            lines.append('# TYPE throttle_decisions_total counter')
+            for (scope, result), count in sorted(self._throttles.items()):
+                lines.append(f'throttle_decisions_total{{scope="{scope}",result="{result}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    route, method = labels
+    return f'route="{route}",method="{method}"'
+
+
+def _histogram(lines, name, help_text, series):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, histogram in series:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{_labels(labels)},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{_labels(labels)},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{_labels(labels)}}} {histogram.total}')
+        lines.append(f'{name}_count{{{_labels(labels)}}} {histogram.count}')
+
+
+registry = Registry()
+
+
+class Sample:
+    __slots__ = ('duration', 'queries', 'sql_seconds', 'render_seconds', 'response_bytes', 'statements')
+
+    def __init__(self, keep_statements):
+        self.duration = 0.0
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.render_seconds = 0.0
+        self.response_bytes = 0
+        self.statements = [] if keep_statements else None
+
+    def add_query(self, elapsed, sql):
+        self.queries += 1
+        self.sql_seconds += elapsed
+        if self.statements is not None and len(self.statements) < SLOW_LOG_MAX_QUERIES:
+            self.statements.append((elapsed, sql))
+
+
+def record_sql(execute, sql, params, many, context):
+    """execute_wrapper кожного з'єднання; поза запитом (_current порожній) лише пропускає SQL."""
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.add_query(time.perf_counter() - started, sql)
+
+
+def install_sql_wrapper(connection, **kwargs):
+    if record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_sql)
+
+
+# нові з'єднання (будь-який аліас, будь-який потік) отримують обгортку одразу
+connection_created.connect(install_sql_wrapper, dispatch_uid='menu_api.metrics.record_sql')
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return (match.url_name or match.view_name) if match else 'unmatched'
+
+
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', None)
+        # з'єднання, відкриті ще до першого запиту (керівні команди, тести)
+        for connection in connections.all(initialized_only=True):
+            install_sql_wrapper(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        sample = Sample(keep_statements=self.slow_ms is not None)
+        token = _current.set(sample)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        sample.duration = time.perf_counter() - started
+        self.finish(request, response, sample)
+        return response
+
+    async def __acall__(self, request):
+        # ORM тут працює в потоках sync_to_async; ContextVar переходить туди разом з контекстом
+        sample = Sample(keep_statements=self.slow_ms is not None)
+        token = _current.set(sample)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        sample.duration = time.perf_counter() - started
+        self.finish(request, response, sample)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF Response рендериться вже після view: міряємо від цього хука до post-render
+        sample = _current.get()
+        if sample is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                sample.render_seconds += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def finish(self, request, response, sample):
+        if not response.streaming:
+            sample.response_bytes = len(response.content)
+        route = route_name(request)
+        registry.record(route, request.method, response.status_code, sample)
+
+        if self.slow_ms is not None and sample.duration * 1000 >= self.slow_ms:
+            slowest = sorted(sample.statements or [], reverse=True)[:5]
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %d SQL (%.1f ms), render %.1f ms\n%s",
+                request.method, request.path, route, sample.duration * 1000, sample.queries,
+                sample.sql_seconds * 1000, sample.render_seconds * 1000,
+                '\n'.join(f'  {elapsed * 1000:.1f} ms  {sql}' for elapsed, sql in slowest),
+            )
+
+
+class IsMetricsScraperOrAdmin(permissions.BasePermission):
+    """
+    Staff або скрейпер з `Authorization: Bearer <METRICS_TOKEN>`. IP не перевіряємо:
+    за локальним reverse proxy всі запити приходять з 127.0.0.1.
+    """
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        expected = getattr(settings, 'METRICS_TOKEN', None)
+        header = request.headers.get('Authorization', '')
+        if not expected or not header.startswith('Bearer '):
+            return False
+        return hmac.compare_digest(header[len('Bearer '):].strip().encode(), expected.encode())
+
+
+class MetricsAPIView(APIView):
+    """GET /api/metrics/ — Prometheus text format; для staff або з METRICS_TOKEN."""
+    permission_classes = [IsMetricsScraperOrAdmin]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
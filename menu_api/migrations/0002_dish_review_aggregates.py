@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:49
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_review_aggregates(apps, schema_editor):
+    Dish = apps.get_model('menu_api', 'Dish')
+    Review = apps.get_model('menu_api', 'Review')
+
+    totals = Review.objects.values('dish').annotate(count=Count('id'), total=Sum('rating'))
+    dishes = Dish.objects.in_bulk([row['dish'] for row in totals])
+    for row in totals:
+        dish = dishes[row['dish']]
+        dish.review_count = row['count']
+        dish.rating_sum = row['total']
+        dish.rating = (Decimal(row['total']) / row['count']).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    Dish.objects.bulk_update(dishes.values(), ['review_count', 'rating_sum', 'rating'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сума оцінок'),
+        ),
+        migrations.AddField(
+            model_name='dish',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Кількість відгуків'),
+        ),
+        migrations.RunPython(backfill_review_aggregates, migrations.RunPython.noop),
+    ]
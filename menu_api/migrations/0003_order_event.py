@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0002_dish_review_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('order.created', 'Нове замовлення'), ('order.status', 'Зміна статусу')], max_length=20, verbose_name='Тип')),
+                ('payload', models.JSONField(verbose_name='Дані')),
+                ('date', models.DateTimeField(auto_now_add=True, verbose_name='Дата події')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='menu_api.order', verbose_name='Замовлення')),
+            ],
+            options={
+                'verbose_name': 'Подія замовлення',
+                'verbose_name_plural': 'Події замовлень',
+            },
+        ),
+    ]
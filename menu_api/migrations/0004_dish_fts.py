@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# DDL зафіксовано тут, а не імпортовано з menu_api.search: міграція має лишатися
+# такою, як була на момент створення, хоч би як модуль пошуку змінювався далі
+CREATE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS menu_api_dish_fts "
+    "USING fts5(name, description, tokenize='unicode61 remove_diacritics 2')"
+)
+FILL_FTS = (
+    "INSERT INTO menu_api_dish_fts (rowid, name, description) "
+    "SELECT id, name, description FROM menu_api_dish"
+)
+DROP_FTS = "DROP TABLE IF EXISTS menu_api_dish_fts"
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_FTS)
+    schema_editor.execute(FILL_FTS)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_FTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0003_order_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
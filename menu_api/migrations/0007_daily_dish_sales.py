@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0006_dish_photo_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyDishSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('quantity', models.PositiveIntegerField(default=0, verbose_name='Кількість')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Виручка')),
+                ('order_count', models.PositiveIntegerField(default=0, verbose_name='Замовлень')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_sales', to='menu_api.category', verbose_name='Категорія')),
+                ('dish', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='menu_api.dish', verbose_name='Страва')),
+            ],
+            options={
+                'verbose_name': 'Продажі за день',
+                'verbose_name_plural': 'Продажі за день',
+                'unique_together': {('day', 'dish')},
+            },
+        ),
+    ]
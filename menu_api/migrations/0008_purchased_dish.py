@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def backfill(apps, schema_editor):
+    OrderItem = apps.get_model('menu_api', 'OrderItem')
+    PurchasedDish = apps.get_model('menu_api', 'PurchasedDish')
+    rows = (
+        OrderItem.objects.filter(order__status='COMPLETED', order__user__isnull=False)
+        .values('order__user_id', 'dish_id')
+        .annotate(first_completed_at=Min('order__date'))
+        .order_by()
+    )
+    PurchasedDish.objects.bulk_create(
+        [
+            PurchasedDish(user_id=row['order__user_id'], dish_id=row['dish_id'], first_completed_at=row['first_completed_at'])
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0007_daily_dish_sales'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchasedDish',
+            fields=[
+                ('pk', models.CompositePrimaryKey('user', 'dish', blank=True, editable=False, primary_key=True, serialize=False)),
+                ('first_completed_at', models.DateTimeField(verbose_name='Вперше отримано')),
+                ('dish', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchases', to='menu_api.dish', verbose_name='Страва')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='purchased_dishes', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Куплена страва',
+                'verbose_name_plural': 'Куплені страви',
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:15
+
+import menu_api.models
+from django.db import migrations, models
+
+TAG_CODES = ('SPICY', 'SWEET', 'VEGAN', 'MEAT')
+
+
+def codes_to_mask(apps, schema_editor):
+    Dish = apps.get_model('menu_api', 'Dish')
+    for position, code in enumerate(TAG_CODES):
+        Dish.objects.filter(tags=code).update(tag_mask=1 << position)
+
+
+def mask_to_codes(apps, schema_editor):
+    # у старій схемі тег один: лишаємо молодший біт
+    Dish = apps.get_model('menu_api', 'Dish')
+    for dish_id, mask in Dish.objects.exclude(tag_mask=0).values_list('id', 'tag_mask'):
+        position = (mask & -mask).bit_length() - 1
+        Dish.objects.filter(pk=dish_id).update(tags=TAG_CODES[position])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0008_purchased_dish'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dish',
+            name='tag_mask',
+            field=menu_api.models.TagMaskField(blank=True, default=0, verbose_name='Теги'),
+        ),
+        migrations.RunPython(codes_to_mask, mask_to_codes),
+        migrations.RemoveField(
+            model_name='dish',
+            name='tags',
+        ),
+        migrations.RenameField(
+            model_name='dish',
+            old_name='tag_mask',
+            new_name='tags',
+        ),
+        migrations.AddIndex(
+            model_name='dish',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['tags'], name='dish_available_tags_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:28
+
+import time
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    MenuVersion = apps.get_model('menu_api', 'MenuVersion')
+    MenuVersion.objects.create(pk=1, version=time.time_ns())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0009_dish_tag_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версія')),
+            ],
+            options={
+                'verbose_name': 'Версія меню',
+                'verbose_name_plural': 'Версії меню',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0010_menu_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderevent',
+            name='date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата події'),
+        ),
+    ]
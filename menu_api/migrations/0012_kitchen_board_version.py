@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:46
+
+import time
+
+from django.db import migrations, models
+
+
+def create_version_row(apps, schema_editor):
+    KitchenBoardVersion = apps.get_model('menu_api', 'KitchenBoardVersion')
+    KitchenBoardVersion.objects.create(pk=1, version=time.time_ns())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0011_order_event_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KitchenBoardVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версія')),
+            ],
+            options={
+                'verbose_name': 'Версія кухонної дошки',
+                'verbose_name_plural': 'Версії кухонної дошки',
+            },
+        ),
+        migrations.RunPython(create_version_row, migrations.RunPython.noop),
+    ]
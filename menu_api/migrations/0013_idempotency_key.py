@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu_api', '0012_kitchen_board_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('slot', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Ключ (sha256)')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Хеш тіла запиту')),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Код відповіді')),
+                ('response', models.JSONField(blank=True, null=True, verbose_name='Відповідь')),
+                ('date', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата')),
+            ],
+            options={
+                'verbose_name': 'Ключ ідемпотентності',
+                'verbose_name_plural': 'Ключі ідемпотентності',
+            },
+        ),
+    ]
@@ -1,5 +1,12 @@
+import abc
+
+from django import forms
+from django.core.exceptions import EmptyResultSet
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models import Case, DecimalField, F, FloatField, Value, When
+from django.db.models.functions import Cast, Lower, Round
+from django.db.models.lookups import GreaterThan, Lookup
 from django.contrib.auth.models import User
 
 
@@ -9,35 +16,173 @@ class Category(models.Model):
     class Meta:
         verbose_name = "Категорія"
         verbose_name_plural = "Категорії"
+        indexes = [
+            # фільтр меню ?category= без урахування регістру
+            models.Index(Lower('name'), name='category_name_lower_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+TAG_CHOICES = (
+    ('SPICY', 'Гостре'),
+    ('SWEET', 'Солодке'),
+    ('VEGAN', 'Вегетаріанське'),
+    ('MEAT', 'Мясне'),
+)
+# біт на кожен тег; порядок не міняти — маски вже лежать у базі
+TAG_BITS = {code: 1 << position for position, (code, _) in enumerate(TAG_CHOICES)}
+ALL_TAGS = (1 << len(TAG_CHOICES)) - 1
+
+
+def tag_mask(codes):
+    """['SPICY', 'MEAT'] -> 0b1001; невідомий код — KeyError."""
+    mask = 0
+    for code in codes:
+        mask |= TAG_BITS[code]
+    return mask
+
+
+def tag_codes(mask):
+    return [code for code, bit in TAG_BITS.items() if mask & bit]
+
+
+class TagsFormField(forms.MultipleChoiceField):
+    widget = forms.CheckboxSelectMultiple
+
+    def __init__(self, **kwargs):
+        super().__init__(choices=TAG_CHOICES, **kwargs)
+
+    def prepare_value(self, value):
+        return tag_codes(value) if isinstance(value, int) else value
+
+    def clean(self, value):
+        return tag_mask(super().clean(value))
+
+
+class TagMaskField(models.PositiveSmallIntegerField):
+    """
+    Набір тегів як бітова маска (TAG_BITS). Фільтри tags__any / tags__all розгортаються
+    в "tags IN (усі маски, що підходять)": масок лише 2 ** len(TAG_CHOICES), а IN іде
+    по індексу, тоді як "tags & ?" рахувався б для кожного рядка.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', 0)
+        super().__init__(*args, **kwargs)
+
+    def formfield(self, **kwargs):
+        # повз IntegerField.formfield: чекбокси замість числа, без min_value/max_value
+        return models.Field.formfield(self, **{'form_class': TagsFormField, **kwargs})
+
+
+class TagMaskLookup(Lookup, metaclass=abc.ABCMeta):
+    """Розгортає умову на бітах у tags IN (...) по всіх масках, що їй відповідають."""
+
+    @abc.abstractmethod
+    def matches(self, mask, wanted):
+        """Чи підходить маска страви mask під маску фільтра wanted."""
+
+    def as_sql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        masks = [mask for mask in range(ALL_TAGS + 1) if self.matches(mask, self.rhs)]
+        if not masks:
+            raise EmptyResultSet
+        return f"{lhs} IN ({', '.join(['%s'] * len(masks))})", (*params, *masks)
+
+
+@TagMaskField.register_lookup
+class HasAnyTag(TagMaskLookup):
+    lookup_name = 'any'
+
+    def matches(self, mask, wanted):
+        return bool(mask & wanted)
+
+
+@TagMaskField.register_lookup
+class HasAllTags(TagMaskLookup):
+    lookup_name = 'all'
+
+    def matches(self, mask, wanted):
+        return mask & wanted == wanted
+
+
 class Dish(models.Model):
-    TAG_CHOICES = (
-        ('SPICY', 'Гостре'),
-        ('SWEET', 'Солодке'),
-        ('VEGAN', 'Вегетаріанське'),
-        ('MEAT', 'Мясне'),
-    )
+    TAG_CHOICES = TAG_CHOICES
 
     name = models.CharField(max_length=255, unique=True, verbose_name='Назва страви')
     description = models.TextField(verbose_name='Опис')
     price = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)], verbose_name="Ціна")
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='dishes', verbose_name="Категорія")
     photo = models.ImageField(upload_to='dishes_photos/', blank=True, null=True, verbose_name="Фото")
+    # {'source': photo.name, 'thumbnail': {'webp': ..., 'jpeg': ...}, ...}, див. images.py
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Варіанти фото")
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00, validators=[MinValueValidator(0), MaxValueValidator(5)], verbose_name='Рейтинг')
     is_available = models.BooleanField(default=True, verbose_name="Наявність")
-    tags = models.CharField(max_length=20, choices=TAG_CHOICES, blank=True, null=True, verbose_name="Теги")
+    tags = TagMaskField(blank=True, verbose_name="Теги")
+    # лічильники для rating: оновлюються атомарно при зміні відгуків
+    review_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Кількість відгуків")
+    rating_sum = models.PositiveIntegerField(default=0, editable=False, verbose_name="Сума оцінок")
 
     class Meta:
         verbose_name = "Страва"
         verbose_name_plural = "Страви"
+        indexes = [
+            # меню: лише доступні страви, фільтр за категорією і max_price
+            models.Index(
+                fields=['category', 'price'], condition=models.Q(is_available=True),
+                name='dish_available_cat_price_idx',
+            ),
+            models.Index(
+                fields=['price'], condition=models.Q(is_available=True),
+                name='dish_available_price_idx',
+            ),
+            # ?tags= / ?tags_all=: tags IN (маски), див. TagMaskField
+            models.Index(
+                fields=['tags'], condition=models.Q(is_available=True),
+                name='dish_available_tags_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    # пишуться лише через apply_review_delta / recompute_ratings
+    REVIEW_AGGREGATES = ('rating', 'review_count', 'rating_sum')
+
+    def save(self, *args, **kwargs):
+        # звичайне оновлення страви не перетирає лічильники, які встиг змінити відгук
+        # з іншого запиту, поки цей екземпляр лежав у пам'яті
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            skipped = set(self.REVIEW_AGGREGATES) | self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skipped and field.attname not in skipped
+            ]
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def rating_expression(count, total):
+        """SQL-вираз середньої оцінки з кількості та суми."""
+        average = Cast(total, FloatField()) / count
+        return Case(
+            When(GreaterThan(count, 0), then=Round(average, 2)),
+            default=Value(0),
+            output_field=DecimalField(max_digits=3, decimal_places=2),
+        )
+
+    @classmethod
+    def apply_review_delta(cls, dish_id, count_delta, sum_delta):
+        # один UPDATE з F-виразами: без читання і без гонок між воркерами
+        count = F('review_count') + count_delta
+        total = F('rating_sum') + sum_delta
+        cls.objects.filter(pk=dish_id).update(
+            review_count=count,
+            rating_sum=total,
+            rating=cls.rating_expression(count, total),
+        )
+
 
 class Order(models.Model):
     STATUS_CHOICES = (
@@ -55,6 +200,16 @@ class Order(models.Model):
         verbose_name = "Замовлення"
         verbose_name_plural = "Замовлення"
         ordering = ['-date']
+        indexes = [
+            # стрічка замовлень (курсор по -date, -id): staff і власні
+            models.Index(fields=['-date', '-id'], name='order_date_idx'),
+            models.Index(fields=['user', '-date', '-id'], name='order_user_date_idx'),
+            # перевірка права на відгук: лише завершені замовлення користувача
+            models.Index(
+                fields=['user'], condition=models.Q(status='COMPLETED'),
+                name='order_user_completed_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Замовлення #{self.id} від {self.user.username if self.user else 'Гість'}"
@@ -91,7 +246,111 @@ class Review(models.Model):
         verbose_name = "Відгук"
         verbose_name_plural = "Відгуки"
         unique_together = ('dish', 'user')
+        indexes = [
+            models.Index(fields=['dish', '-date', '-id'], name='review_dish_date_idx'),
+        ]
 
     def __str__(self):
         return f"Відгук {self.user.username} на {self.dish.name} ({self.rating}/5)"
 
+
+class PurchasedDish(models.Model):
+    """
+    Страви, які користувач отримав у завершених замовленнях (див. purchases.py).
+    Право на відгук — пошук за первинним ключем (user, dish).
+    """
+    pk = models.CompositePrimaryKey('user', 'dish')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='purchased_dishes', verbose_name="Користувач")
+    dish = models.ForeignKey(Dish, on_delete=models.CASCADE, related_name='purchases', verbose_name="Страва")
+    first_completed_at = models.DateTimeField(verbose_name="Вперше отримано")
+
+    class Meta:
+        verbose_name = "Куплена страва"
+        verbose_name_plural = "Куплені страви"
+
+    def __str__(self):
+        return f"{self.user_id} → {self.dish_id}"
+
+
+class OrderEvent(models.Model):
+    """Журнал подій замовлень для SSE-стріму; id слугує курсором Last-Event-ID."""
+    KIND_CHOICES = (
+        ('order.created', 'Нове замовлення'),
+        ('order.status', 'Зміна статусу'),
+    )
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='events', verbose_name="Замовлення")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Тип")
+    payload = models.JSONField(verbose_name="Дані")
+    date = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Дата події")
+
+    class Meta:
+        verbose_name = "Подія замовлення"
+        verbose_name_plural = "Події замовлень"
+
+    def __str__(self):
+        return f"{self.kind} #{self.order_id}"
+
+
+class DailyDishSales(models.Model):
+    """Денний підсумок продажів страви по завершених замовленнях (див. analytics.py)."""
+    day = models.DateField(verbose_name="День")
+    dish = models.ForeignKey(Dish, on_delete=models.CASCADE, related_name='daily_sales', verbose_name="Страва")
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='daily_sales', verbose_name="Категорія")
+    quantity = models.PositiveIntegerField(default=0, verbose_name="Кількість")
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="Виручка")
+    order_count = models.PositiveIntegerField(default=0, verbose_name="Замовлень")
+
+    class Meta:
+        verbose_name = "Продажі за день"
+        verbose_name_plural = "Продажі за день"
+        unique_together = ('day', 'dish')
+
+    def __str__(self):
+        return f"{self.day} {self.dish_id}: {self.quantity} шт."
+
+
+class IdempotencyKey(models.Model):
+    """
+    Idempotency-Key запиту (idempotency.py). Рядок займає той, чий INSERT пройшов першим;
+    поки status_code порожній, запит ще виконується.
+    """
+    slot = models.CharField(max_length=64, primary_key=True, verbose_name="Ключ (sha256)")
+    fingerprint = models.CharField(max_length=64, verbose_name="Хеш тіла запиту")
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Код відповіді")
+    response = models.JSONField(null=True, blank=True, verbose_name="Відповідь")
+    date = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Дата")
+
+    class Meta:
+        verbose_name = "Ключ ідемпотентності"
+        verbose_name_plural = "Ключі ідемпотентності"
+
+    def __str__(self):
+        return self.slot
+
+
+class MenuVersion(models.Model):
+    """
+    Один рядок: версія меню для знімків і ETag (cache.py). Лежить у базі, а не в кеші
+    процесу, тож зміна страви в одному воркері одразу видна всім іншим.
+    """
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Версія")
+
+    class Meta:
+        verbose_name = "Версія меню"
+        verbose_name_plural = "Версії меню"
+
+    def __str__(self):
+        return str(self.version)
+
+
+class KitchenBoardVersion(models.Model):
+    """Один рядок: версія кухонної дошки (kitchen.py), спільна для всіх воркерів, як MenuVersion."""
+    version = models.PositiveBigIntegerField(default=0, verbose_name="Версія")
+
+    class Meta:
+        verbose_name = "Версія кухонної дошки"
+        verbose_name_plural = "Версії кухонної дошки"
+
+    def __str__(self):
+        return str(self.version)
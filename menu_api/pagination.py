@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class DateCursorPagination(CursorPagination):
+    """
+    Keyset-пагінація по (-date, -id): сторінка береться через WHERE date < курсор,
+    без OFFSET-сканів і без COUNT(*), а нові записи не зсувають уже видані сторінки.
+    """
+    ordering = ('-date', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
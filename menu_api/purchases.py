@@ -0,0 +1,57 @@
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef
+from django.utils import timezone
+
+from .models import OrderItem, PurchasedDish
+
+
+def record_order(order):
+    """Замовлення стало COMPLETED: один INSERT OR IGNORE на всі його страви."""
+    if order.user_id is None:
+        return
+    completed_at = timezone.now()
+    PurchasedDish.objects.bulk_create(
+        [
+            PurchasedDish(user_id=order.user_id, dish_id=dish_id, first_completed_at=completed_at)
+            for dish_id in {item.dish_id for item in order.items.all()}
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def forget_order(order):
+    """
+    Замовлення вийшло з COMPLETED: знімаємо страви, яких немає в інших
+    завершених замовленнях користувача. Уже залишені відгуки не чіпаємо.
+    """
+    if order.user_id is None:
+        return
+    still_completed = OrderItem.objects.filter(
+        order__user_id=order.user_id, order__status='COMPLETED', dish_id=OuterRef('dish_id'),
+    )
+    PurchasedDish.objects.filter(
+        user_id=order.user_id, dish_id__in={item.dish_id for item in order.items.all()},
+    ).filter(~Exists(still_completed)).delete()
+
+
+def rebuild(batch_size=1000):
+    """
+    Перебудовує таблицю з історії одним груповим запитом. Момент завершення
+    не зберігався, тож first_completed_at — дата найпершого такого замовлення.
+    """
+    rows = (
+        OrderItem.objects.filter(order__status='COMPLETED', order__user__isnull=False)
+        .values('order__user_id', 'dish_id')
+        .annotate(first_completed_at=Min('order__date'))
+        .order_by()
+    )
+    with transaction.atomic():
+        PurchasedDish.objects.all().delete()
+        created = PurchasedDish.objects.bulk_create(
+            [
+                PurchasedDish(user_id=row['order__user_id'], dish_id=row['dish_id'], first_completed_at=row['first_completed_at'])
+                for row in rows
+            ],
+            batch_size=batch_size,
+        )
+    return len(created)
@@ -0,0 +1,40 @@
+try:
+    import orjson
+except ImportError:  # необов'язкова залежність: без неї — звичайний JSONRenderer
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+
+# datetime/dataclass orjson форматує по-своєму — віддаємо їх енкодеру DRF
+PASSTHROUGH = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer через orjson. Вивід байт-у-байт той самий, що й у JSONRenderer
+    з налаштуваннями за замовчуванням (компактно, UTF-8); у решті випадків —
+    indent, ensure_ascii, типи, яких orjson не знає, — рендерить сам JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None
+            or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON)
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.default, option=PASSTHROUGH)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer екранує U+2028/U+2029 заради JSONP/inline-скриптів
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+    def default(self, obj):
+        value = self.encoder_class().default(obj)
+        if isinstance(value, float):
+            # Decimal -> float: orjson і json по-різному пишуть експоненту
+            raise TypeError
+        return value
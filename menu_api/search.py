@@ -0,0 +1,106 @@
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+
+# FTS5-індекс по Dish.name / Dish.description; rowid = Dish.id
+FTS_TABLE = 'menu_api_dish_fts'
+# назва важить більше за опис у ранжуванні bm25
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+SEARCH_LIMIT = 200
+
+
+def is_supported(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def create_index(conn=None):
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(name, description, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_index(conn=None):
+    with (conn or connection).cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def index_dish(dish):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [dish.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)",
+            [dish.pk, dish.name, dish.description],
+        )
+
+
+def remove_dish(dish_id):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [dish_id])
+
+
+def reindex(dish_ids):
+    """Переіндексовує набір страв двома запитами (для масових операцій без сигналів)."""
+    dish_ids = list(dish_ids)
+    if not dish_ids or not is_supported():
+        return
+    placeholders = ', '.join(['%s'] * len(dish_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", dish_ids)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description) "
+            f"SELECT id, name, description FROM menu_api_dish WHERE id IN ({placeholders})",
+            dish_ids,
+        )
+
+
+def rebuild(conn=None):
+    """Повністю перебудовує індекс одним INSERT ... SELECT."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description) "
+            f"SELECT id, name, description FROM menu_api_dish"
+        )
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def match_expression(query):
+    # кожне слово — префіксний терм, усі терми через AND; лапки екрануємо
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join('"%s"*' % word.replace('"', '""') for word in words)
+
+
+def search_ids(query, queryset=None, limit=None):
+    """
+    Id страв, відсортовані за релевантністю (bm25).
+    queryset (фільтри наявності, категорії, ціни, тегів) іде підзапитом у той самий
+    SELECT, тож LIMIT відрізає вже відфільтровані страви, а не сирі збіги FTS.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+    scope, scope_params = '', []
+    if queryset is not None:
+        try:
+            sql, scope_params = queryset.order_by().values('pk').query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        scope = f"AND rowid IN ({sql}) "
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s {scope}"
+            f"ORDER BY bm25({FTS_TABLE}, %s, %s) LIMIT %s",
+            [expression, *scope_params, NAME_WEIGHT, DESCRIPTION_WEIGHT, limit or SEARCH_LIMIT],
+        )
+        return [row[0] for row in cursor.fetchall()]
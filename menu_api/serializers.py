@@ -1,8 +1,28 @@
+from decimal import Decimal
+
+from django.core.files.storage import default_storage
+from django.db import transaction
 from rest_framework import serializers
-from .models import Category, Dish, Order, OrderItem, Review
+from . import events
+from . import images
+from . import kitchen
+from .models import ALL_TAGS, TAG_BITS, TAG_CHOICES, Category, Dish, Order, OrderItem, Review, tag_mask
 from django.contrib.auth.models import User
 
 
+class SparseFieldsMixin:
+    """
+    fields=[...] у конструкторі лишає тільки ці поля (?fields= / ?expand= у views).
+    Поля відкидаються до серіалізації, тож їхні source не читаються взагалі.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -39,9 +59,10 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only_fields = ('user', 'date')
 
 
-class DishListSerializer(serializers.ModelSerializer):
+class DishListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
-    tags = serializers.CharField(source='get_tags_display', read_only=True)
+    tags = serializers.SerializerMethodField()
+    photo_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Dish
@@ -53,19 +74,154 @@ class DishListSerializer(serializers.ModelSerializer):
             'rating',
             'is_available',
             'photo',
+            'photo_variants',
             'tags',
         )
+        # рахуються з відгуків (Dish.apply_review_delta), а не приходять від клієнта
+        read_only_fields = ('rating', 'review_count', 'rating_sum')
+
+    def get_photo_variants(self, obj):
+        return photo_variant_urls(obj.photo.name if obj.photo else None, obj.photo_variants, self.context.get('request'))
+
+    def get_tags(self, obj):
+        return TAG_LABELS[obj.tags & ALL_TAGS]
+
+
+def media_url(name, request):
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def photo_variant_urls(photo_name, variants, request):
+    """{'thumbnail': {'webp': url, 'jpeg': url}, 'card': ..., 'detail': ...} для srcset."""
+    variants = variants or {}
+    if not photo_name or variants.get('source') != photo_name:
+        return None
+    return {
+        variant: {ext: media_url(name, request) for ext, name in variants.get(variant, {}).items()}
+        for variant in images.VARIANTS
+    }
+
+
+DISH_LIST_COLUMNS = (
+    'id', 'name', 'price', 'category_id', 'category__name', 'rating',
+    'is_available', 'photo', 'photo_variants', 'tags',
+)
+# маска -> назви тегів; усіх масок 2 ** len(TAG_CHOICES), тож рахуємо їх один раз
+TAG_LABELS = tuple(
+    tuple(label for code, label in TAG_CHOICES if mask & TAG_BITS[code])
+    for mask in range(ALL_TAGS + 1)
+)
+
+
+def dish_list_rows(queryset, request=None):
+    """
+    Швидкий шлях DishListSerializer(many=True).data: рядки з values_list без моделей
+    і полів DRF. Ключі, їхній порядок і формат значень — ті самі (див. parity-тест).
+    """
+    return [
+        dish_list_row(row, request)
+        for row in queryset.values_list(*DISH_LIST_COLUMNS)
+    ]
+
+
+def dish_list_row(row, request=None):
+    dish_id, name, price, category_id, category_name, rating, is_available, photo, variants, tags = row
+    return {
+        'id': dish_id,
+        'name': name,
+        'price': '{:f}'.format(price),
+        'category': {'id': category_id, 'name': category_name},
+        'rating': '{:f}'.format(rating),
+        'is_available': is_available,
+        'photo': media_url(photo, request) if photo else None,
+        'photo_variants': photo_variant_urls(photo, variants, request),
+        'tags': TAG_LABELS[tags & ALL_TAGS],
+    }
+
+
+# скільки останніх відгуків вбудовується в деталку; решта — /dishes/<id>/reviews/
+EMBEDDED_REVIEWS = 5
 
 
 class DishDetailSerializer(DishListSerializer):
-    reviews = ReviewSerializer(many=True, read_only=True)
+    reviews = serializers.SerializerMethodField()
     description = serializers.CharField()
 
     class Meta(DishListSerializer.Meta):
-        fields = DishListSerializer.Meta.fields + ('description', 'reviews')
+        fields = DishListSerializer.Meta.fields + ('description', 'review_count', 'reviews')
+
+    def get_reviews(self, obj):
+        # latest_reviews підвантажує views.latest_reviews_prefetch() одним запитом
+        reviews = getattr(obj, 'latest_reviews', None)
+        if reviews is None:
+            reviews = obj.reviews.select_related('user').order_by('-date', '-id')[:EMBEDDED_REVIEWS]
+        return ReviewSerializer(reviews, many=True, context=self.context).data
+
+
+class MenuImportRowSerializer(serializers.Serializer):
+    """Рядок файлу меню для масового імпорту (див. menu_import.py)."""
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, default='')
+    price = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=0)
+    category = serializers.CharField(max_length=100)
+    is_available = serializers.BooleanField(default=True)
+    # "SPICY,MEAT" у CSV або ["SPICY", "MEAT"] у JSON; у базу йде маска
+    tags = serializers.JSONField(allow_null=True, default=None)
+
+    def validate_tags(self, value):
+        if not value:
+            return 0
+        codes = value.split(',') if isinstance(value, str) else value
+        if not isinstance(codes, list):
+            raise serializers.ValidationError('Очікується рядок або список тегів.')
+        codes = [str(code).strip().upper() for code in codes if str(code).strip()]
+        unknown = sorted(set(codes) - TAG_BITS.keys())
+        if unknown:
+            raise serializers.ValidationError(f"Невідомі теги: {', '.join(unknown)}")
+        return tag_mask(codes)
+
+
+class SalesTotalsSerializer(serializers.Serializer):
+    quantity = serializers.IntegerField()
+    # гроші в API — рядок з двома знаками, як price і sums
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class SalesDaySerializer(serializers.Serializer):
+    day = serializers.DateField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class SalesCategorySerializer(serializers.Serializer):
+    category_id = serializers.IntegerField()
+    name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class SalesDishSerializer(serializers.Serializer):
+    dish_id = serializers.IntegerField()
+    name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+    orders = serializers.IntegerField()
+
+
+class SalesReportSerializer(serializers.Serializer):
+    """Відповідь GET /api/analytics/sales/ (див. analytics.sales_report)."""
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    totals = SalesTotalsSerializer()
+    by_day = SalesDaySerializer(many=True)
+    by_category = SalesCategorySerializer(many=True)
+    top_dishes = SalesDishSerializer(many=True)
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    # страву резолвимо пачкою в OrderSerializer, а не окремим запитом на кожен рядок
+    dish = serializers.IntegerField(source='dish_id')
     dish_name = serializers.CharField(source='dish.name', read_only=True)
 
     class Meta:
@@ -74,7 +230,80 @@ class OrderItemSerializer(serializers.ModelSerializer):
         read_only_fields = ('price',)
 
 
-class OrderSerializer(serializers.ModelSerializer):
+def attach_dishes(orders):
+    """Одним запитом підтягує страви для всіх позицій усіх замовлень."""
+    dish_ids = {item['dish_id'] for order in orders for item in order['items']}
+    dishes = Dish.objects.only('id', 'name', 'price').in_bulk(dish_ids)
+
+    missing = sorted(dish_ids - dishes.keys())
+    if missing:
+        raise serializers.ValidationError(
+            {'items': f"Страв не існує: {', '.join(map(str, missing))}"}
+        )
+
+    for order in orders:
+        # однакові страви в одному замовленні зливаємо (unique_together order+dish)
+        merged = {}
+        for item in order['items']:
+            if item['dish_id'] in merged:
+                merged[item['dish_id']]['quantity'] += item['quantity']
+            else:
+                merged[item['dish_id']] = {**item, 'dish': dishes[item['dish_id']]}
+        order['items'] = list(merged.values())
+    return orders
+
+
+def build_order(validated_data, user):
+    items_data = validated_data.pop('items')
+    items = [
+        OrderItem(dish=item['dish'], quantity=item['quantity'], price=item['dish'].price)
+        for item in items_data
+    ]
+    total_sum = sum((item.price * item.quantity for item in items), Decimal('0.00'))
+    # замовлення одразу вставляється з фінальною сумою
+    return Order(user=user, sums=total_sum, **validated_data), items
+
+
+def save_items(order, items):
+    for item in items:
+        item.order = order
+    OrderItem.objects.bulk_create(items)
+    # відповідь серіалізує items без повторного запиту
+    order._prefetched_objects_cache = {'items': items}
+
+
+def request_user(context):
+    request = context.get('request')
+    if request and hasattr(request, 'user') and request.user.is_authenticated:
+        return request.user
+    return None
+
+
+class OrderListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        return attach_dishes(attrs)
+
+    def create(self, validated_data):
+        user = request_user(self.context)
+        built = [build_order(order_data, user) for order_data in validated_data]
+        orders = [order for order, _ in built]
+
+        with transaction.atomic():
+            Order.objects.bulk_create(orders)
+            for order, items in built:
+                for item in items:
+                    item.order = order
+            OrderItem.objects.bulk_create([item for _, items in built for item in items])
+
+            for order, items in built:
+                order._prefetched_objects_cache = {'items': items}
+            events.publish(events.ORDER_CREATED, self.child.__class__(orders, many=True).data)
+            kitchen.invalidate()
+
+        return orders
+
+
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True)
     user_info = UserSerializer(source='user', read_only=True)
 
@@ -83,33 +312,21 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'user_info', 'date', 'sums', 'status', 'items')
         # user і sums виставляємо самі, status бере дефолт із моделі
         read_only_fields = ('user', 'sums', 'status')
+        list_serializer_class = OrderListSerializer
+
+    def validate(self, attrs):
+        # у пакетному режимі страви підтягує OrderListSerializer
+        if self.parent is None:
+            attach_dishes([attrs])
+        return attrs
 
     def create(self, validated_data):
-        items_data = validated_data.pop('items')
-        request = self.context.get('request')
-        if request and hasattr(request, 'user') and request.user.is_authenticated:
-            user = request.user
-        else:
-            user = None
-
-        # створюємо замовлення без суми
-        order = Order.objects.create(user=user, **validated_data)
-
-        total_sum = 0
-        for item_data in items_data:
-            dish = item_data['dish']
-            quantity = item_data['quantity']
-            price = dish.price
-
-            OrderItem.objects.create(
-                order=order,
-                dish=dish,
-                quantity=quantity,
-                price=price,
-            )
-            total_sum += price * quantity
-
-        order.sums = total_sum
-        order.save()
+        order, items = build_order(validated_data, request_user(self.context))
+
+        with transaction.atomic():
+            order.save()
+            save_items(order, items)
+            events.publish(events.ORDER_CREATED, [self.__class__(order).data])
+            kitchen.invalidate()
 
         return order
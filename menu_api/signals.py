@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import cache as menu_cache
+from . import images
+from . import search
+from .authentication import token_cache
+from .models import Category, Dish, Review
+
+
+# рейтинг оновлюємо до інвалідації меню, щоб новий знімок вже бачив його
+@receiver(pre_save, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    instance._previous = None
+    if not instance._state.adding and instance.pk:
+        instance._previous = (
+            Review.objects.filter(pk=instance.pk).values_list('dish_id', 'rating').first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous', None)
+    if previous is None:
+        Dish.apply_review_delta(instance.dish_id, 1, instance.rating)
+        return
+
+    old_dish_id, old_rating = previous
+    if old_dish_id != instance.dish_id:
+        Dish.apply_review_delta(old_dish_id, -1, -old_rating)
+        Dish.apply_review_delta(instance.dish_id, 1, instance.rating)
+    elif old_rating != instance.rating:
+        Dish.apply_review_delta(instance.dish_id, 0, instance.rating - old_rating)
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    Dish.apply_review_delta(instance.dish_id, -1, -instance.rating)
+
+
+@receiver(post_save, sender=Dish)
+def index_dish(sender, instance, **kwargs):
+    search.index_dish(instance)
+
+
+@receiver(post_save, sender=Dish)
+def schedule_photo_variants(sender, instance, raw=False, **kwargs):
+    name = instance.photo.name if instance.photo else ''
+    if raw or not name or instance.photo_variants.get('source') == name:
+        return
+    transaction.on_commit(
+        lambda: images.schedule_variants(instance.pk, str(settings.MEDIA_ROOT), name)
+    )
+
+
+@receiver(post_delete, sender=Dish)
+def unindex_dish(sender, instance, **kwargs):
+    search.remove_dish(instance.pk)
+
+
+# деталка страви містить відгуки, тому вони теж інвалідовують знімок меню
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Dish)
+@receiver([post_save, post_delete], sender=Review)
+def bump_menu_version(sender, **kwargs):
+    menu_cache.bump_menu_version()
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    token_cache.discard(instance.key)
+
+
+# деактивація, зміна is_staff чи видалення — кешований користувач більше не актуальний
+@receiver([post_save, post_delete], sender=User)
+def forget_user_tokens(sender, instance, **kwargs):
+    token_cache.discard_user(instance.pk)
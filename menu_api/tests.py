@@ -1,3 +1,1360 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+import time
+import unittest
+import unittest.mock
+from concurrent.futures import Future
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
 
-# Create your tests here.
+from PIL import Image
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django import db
+from django.db import connection
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import (
+    analytics, db_routing, events, exports, images, idempotency, kitchen, menu_import, metrics, purchases, search,
+    throttling,
+)
+from . import cache as menu_cache
+from .authentication import token_cache
+
+from .models import (
+    TAG_BITS, Category, DailyDishSales, Dish, IdempotencyKey, Order, OrderEvent, OrderItem, PurchasedDish, Review,
+    TagMaskLookup,
+)
+from .pagination import DateCursorPagination
+from .renderers import FastJSONRenderer
+from .serializers import DishDetailSerializer, photo_variant_urls
+
+
+def setUpModule():
+    # ліміти вмикає лише ThrottleTests: решта тестів шле десятки запитів з одного IP
+    global no_throttling
+    no_throttling = override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}})
+    no_throttling.enable()
+
+
+def tearDownModule():
+    no_throttling.disable()
+
+
+@override_settings(MENU_VERSION_TTL_SECONDS=60)
+class QueryCountTests(TestCase):
+    """Кількість запитів на ендпоінт не повинна залежати від кількості рядків."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        self.category = Category.objects.create(name='Піца')
+
+    def make_rows(self, count):
+        start = Dish.objects.count()
+        dishes = [
+            Dish.objects.create(
+                name=f'Страва {start + i}', description='опис', price='100.00',
+                category=self.category, tags=TAG_BITS['MEAT'],
+            )
+            for i in range(count)
+        ]
+        for i in range(count):
+            user = User.objects.create(username=f'user{User.objects.count()}')
+            Review.objects.create(dish=dishes[0], user=user, rating=5, comment='смачно')
+            order = Order.objects.create(user=user, status='COMPLETED')
+            for dish in dishes:
+                OrderItem.objects.create(order=order, dish=dish, quantity=1, price=dish.price)
+        return dishes[0]
+
+    def assert_constant(self, queries, request):
+        for size in (2, 5):
+            dish = self.make_rows(size)
+            cache.clear()
+            # версію меню процес уже пам'ятає: у ключ знімка вона йде без запиту
+            menu_cache.get_menu_version()
+            with self.assertNumQueries(queries):
+                response = request(dish)
+            self.assertEqual(response.status_code, 200)
+
+    def test_dish_list(self):
+        self.assert_constant(1, lambda dish: self.client.get('/api/dishes/'))
+
+    def test_dish_detail(self):
+        self.assert_constant(2, lambda dish: self.client.get(f'/api/dishes/{dish.id}/'))
+
+    def test_dish_reviews(self):
+        self.assert_constant(1, lambda dish: self.client.get(f'/api/dishes/{dish.id}/reviews/'))
+
+    def test_staff_order_list(self):
+        self.client.force_authenticate(self.staff)
+        self.assert_constant(2, lambda dish: self.client.get('/api/orders/'))
+
+    def test_order_status_update(self):
+        self.client.force_authenticate(self.staff)
+
+        def update(dish):
+            order = Order.objects.filter(items__dish=dish).first()
+            return self.client.patch(f'/api/orders/{order.id}/status/', {'status': 'NEW'})
+
+        # + зняття права на відгук (PurchasedDish) при виході з COMPLETED, + версія кухонної дошки
+        self.assert_constant(10, update)
+
+    def test_order_create(self):
+        for size in (2, 5):
+            dishes = [self.make_rows(1) for _ in range(size)]
+            items = [{'dish': dish.id, 'quantity': 2} for dish in dishes]
+            # страви + замовлення + bulk_create позицій + подія + версія дошки (+ savepoint)
+            with self.assertNumQueries(7):
+                response = self.client.post('/api/orders/', {'items': items}, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(response.data['sums'], f'{200 * size}.00')
+
+    def test_order_batch_create(self):
+        dishes = [self.make_rows(1) for _ in range(3)]
+        payload = [{'items': [{'dish': dish.id, 'quantity': 1}]} for dish in dishes]
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/orders/batch/', payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 3)
+
+
+@override_settings(MENU_VERSION_TTL_SECONDS=60)
+class MenuSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Супи')
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=self.category)
+
+    def test_etag_and_not_modified(self):
+        for url in ('/api/dishes/', f'/api/dishes/{self.dish.id}/', '/api/dishes/?q=борщ'):
+            first = self.client.get(url)
+            etag = first['ETag']
+            with self.assertNumQueries(0):
+                # і знімок, і версія меню вже в пам'яті процесу
+                self.assertEqual(self.client.get(url).content, first.content)
+            for header in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=header)
+                self.assertEqual((response.status_code, response['ETag'], response.content), (304, etag, b''), header)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_saves_invalidate_snapshot(self):
+        etag = self.client.get('/api/dishes/')['ETag']
+        self.dish.price = '95.00'
+        self.dish.save()
+        response = self.client.get('/api/dishes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['price'], '95.00')
+
+        etag = response['ETag']
+        self.category.name = 'Перші страви'
+        self.category.save()
+        response = self.client.get('/api/dishes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()[0]['category']['name'], 'Перші страви')
+
+    def test_version_bumped_by_another_worker(self):
+        self.client.get('/api/dishes/')
+        # інший процес: свій LocMem і своя пам'ять версії, спільна лише база
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE menu_api_dish SET price = '99.00'")
+            cursor.execute('UPDATE menu_api_menuversion SET version = version + 1')
+        # поки не минув MENU_VERSION_TTL_SECONDS, цей процес віддає свій знімок
+        self.assertEqual(self.client.get('/api/dishes/').json()[0]['price'], '90.00')
+        later = time.monotonic() + 61
+        with unittest.mock.patch('menu_api.cache.time.monotonic', return_value=later):
+            self.assertEqual(self.client.get('/api/dishes/').json()[0]['price'], '99.00')
+
+    def test_own_bump_is_seen_immediately(self):
+        version = menu_cache.get_menu_version()
+        with self.assertNumQueries(0):
+            menu_cache.get_menu_version()
+        menu_cache.bump_menu_version()
+        self.assertGreater(menu_cache.get_menu_version(), version)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN специфічний для SQLite')
+class QueryPlanTests(TestCase):
+    """Жоден SELECT гарячих ендпоінтів не повинен скатуватись у повний SCAN таблиці."""
+    # аліаси, під якими Django загортає віконні фільтри (QUALIFY)
+    DERIVED_TABLES = {'qualify', 'qualify_mask'}
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Pizza')
+        self.dish = Dish.objects.create(
+            name='Маргарита', description='сир', price='150.00', category=self.category, tags=TAG_BITS['VEGAN'],
+        )
+        self.user = User.objects.create(username='guest')
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        order = Order.objects.create(user=self.user, status='COMPLETED')
+        OrderItem.objects.create(order=order, dish=self.dish, quantity=1, price=self.dish.price)
+        purchases.rebuild()
+
+    def full_scans(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            details = [row[3] for row in cursor.fetchall()]
+        # "SCAN t USING INDEX" — обхід індексу (під LIMIT/ORDER BY), це нормально;
+        # SCAN підзапиту (вікно ROW_NUMBER для Prefetch зі зрізом) — це вже відібрані рядки
+        return [
+            detail for detail in details
+            if detail.startswith('SCAN ') and 'USING' not in detail and 'VIRTUAL TABLE' not in detail
+            and not detail.startswith('SCAN (subquery') and detail.split()[1] not in self.DERIVED_TABLES
+        ]
+
+    def assert_no_full_scans(self, method, url, data=None, user=None):
+        client = APIClient()
+        if user:
+            client.force_authenticate(user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400, url)
+
+        selects = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects, url)
+        for sql in selects:
+            self.assertEqual(self.full_scans(sql), [], f'{url}: {sql}')
+
+    def test_dish_endpoints(self):
+        for url in (
+            '/api/dishes/',
+            '/api/dishes/?category=pizza',
+            '/api/dishes/?category=pizza&max_price=200',
+            '/api/dishes/?max_price=200',
+            '/api/dishes/?tags=vegan,meat',
+            '/api/dishes/?tags_all=vegan',
+            '/api/dishes/?q=марг',
+            f'/api/dishes/{self.dish.id}/',
+            f'/api/dishes/{self.dish.id}/reviews/',
+        ):
+            self.assert_no_full_scans('get', url)
+
+    def test_order_endpoints(self):
+        self.assert_no_full_scans('get', '/api/orders/', user=self.staff)
+        self.assert_no_full_scans('get', '/api/orders/', user=self.user)
+
+    def test_review_create(self):
+        self.assert_no_full_scans(
+            'post', '/api/reviews/', {'dish': self.dish.id, 'rating': 5}, user=self.user,
+        )
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create(username='guest')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_cached_auth_skips_token_query(self):
+        self.client.get('/api/orders/')
+        # лишається тільки запит самих замовлень
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/orders/').status_code, 200)
+
+    def test_deactivation_and_token_delete_invalidate(self):
+        self.client.get('/api/orders/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.client.get('/api/orders/')
+        self.token.delete()
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='staff', is_staff=True))
+        Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+
+    def body(self):
+        return self.client.get('/api/metrics/').content.decode()
+
+    def test_records_per_route(self):
+        self.client.get('/api/dishes/')
+        body = self.body()
+        self.assertIn('http_request_duration_seconds_count{route="dish-list",method="GET"} 1', body)
+        self.assertIn('http_request_sql_queries_count{route="dish-list",method="GET"} 1', body)
+        self.assertIn('http_responses_total{route="dish-list",method="GET",status="200"} 1', body)
+        self.assertRegex(body, r'http_response_render_seconds_total\{route="dish-list",method="GET"\} [0-9.e-]+')
+        self.assertNotIn('http_request_serializer_seconds_total', body)
+
+    def test_counts_sql_of_async_views(self):
+        menu_cache.forget_menu_version()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/async/dishes/')
+        # версія меню + список
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertIn('http_request_sql_queries_sum{route="async-dish-list",method="GET"} 2', self.body())
+
+    def test_counts_sql_on_every_alias(self):
+        other = {**settings.DATABASES['default'], 'NAME': ':memory:', 'TEST': {}}
+        with override_settings(DATABASES={**settings.DATABASES, 'metrics-extra': other}):
+            handler = db.ConnectionHandler(settings.DATABASES)
+            with unittest.mock.patch.object(metrics, 'connections', handler):
+                extra = handler['metrics-extra']
+                try:
+                    extra.ensure_connection()
+                    # connection_created додав обгортку і цьому з'єднанню
+                    self.assertIn(metrics.record_sql, extra.execute_wrappers)
+                    sample = metrics.Sample(keep_statements=True)
+                    token = metrics._current.set(sample)
+                    try:
+                        with extra.cursor() as cursor:
+                            cursor.execute('SELECT 1')
+                    finally:
+                        metrics._current.reset(token)
+                    self.assertEqual((sample.queries, sample.statements[0][1]), (1, 'SELECT 1'))
+                finally:
+                    extra.close()
+
+    def test_requires_staff_or_token(self):
+        self.client.force_authenticate(None)
+        # 127.0.0.1 за reverse proxy — вже не пропуск
+        self.assertEqual(self.client.get('/api/metrics/', REMOTE_ADDR='127.0.0.1').status_code, 401)
+        with override_settings(METRICS_TOKEN='scrape-secret'):
+            self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+            self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+        self.client.force_authenticate(User.objects.create(username='guest'))
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+
+class AsyncReadTests(TestCase):
+    """/api/async/ віддає ті самі байти, що й sync-ендпоінти."""
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Піца')
+        self.dish = Dish.objects.create(name='Маргарита', description='сир', price='100.00', category=category, tags=TAG_BITS['MEAT'])
+        for i in range(3):
+            Review.objects.create(dish=self.dish, user=User.objects.create(username=f'user{i}'), rating=4, comment='ok')
+
+    async def test_matches_sync_views(self):
+        paths = ['/dishes/', '/dishes/?category=піца&q=марг', f'/dishes/{self.dish.id}/', '/dishes/999/']
+        for path in paths:
+            await cache.aclear()
+            expected = await self.async_client.get(f'/api{path}', headers={'accept': 'application/json'})
+            await cache.aclear()
+            response = await self.async_client.get(f'/api/async{path}')
+            self.assertEqual(response.status_code, expected.status_code, path)
+            self.assertEqual(response.content, expected.content, path)
+
+        response = await self.async_client.get(f'/api/async/dishes/{self.dish.id}/reviews/?page_size=2')
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIn('/api/async/dishes/', response.json()['next'])
+
+
+class ReadReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = db_routing.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+        # view лише фіксує, куди роутер відправив би читання
+        self.middleware = db_routing.ReadYourWritesMiddleware(
+            lambda request: HttpResponse(self.router.db_for_read(Dish))
+        )
+
+    def request(self, method='get', **headers):
+        request = getattr(self.factory, method)('/api/dishes/', **headers)
+        return self.middleware(request)
+
+    def read_db(self, method='get', **headers):
+        return self.request(method, **headers).content.decode()
+
+    def test_without_replica_everything_is_primary(self):
+        self.assertEqual(self.read_db(), 'default')
+        self.assertFalse(self.request('post').has_header(db_routing.STICKY_HEADER))
+
+    def test_reads_your_writes_after_post(self):
+        with override_settings(DATABASES={**settings.DATABASES, 'replica': settings.DATABASES['default']}):
+            self.assertEqual(self.read_db(), 'replica')
+            response = self.request('post')
+            self.assertEqual(response.content.decode(), 'default')
+            token = response[db_routing.STICKY_HEADER]
+            self.assertEqual(response.cookies[db_routing.STICKY_COOKIE].value, token)
+
+            # мітку несе клієнт, тож кеш процесу (інший воркер) нічого не змінює
+            cache.clear()
+            self.factory.cookies[db_routing.STICKY_COOKIE] = token
+            self.assertEqual(self.read_db(), 'default')
+            self.factory.cookies.clear()
+            self.assertEqual(self.read_db(HTTP_X_DB_PRIMARY=token), 'default')
+            self.assertEqual(self.read_db(HTTP_X_DB_PRIMARY=token + 'x'), 'replica')
+            self.assertEqual(self.read_db(), 'replica')
+            with override_settings(REPLICA_STICKY_SECONDS=0):
+                # мітка старша за REPLICA_STICKY_SECONDS — знову репліка
+                self.middleware = db_routing.ReadYourWritesMiddleware(self.middleware.get_response)
+                self.assertEqual(self.read_db(HTTP_X_DB_PRIMARY=token), 'replica')
+            self.assertEqual(self.router.db_for_read(Dish), 'default')
+            self.assertEqual(self.router.db_for_write(Dish), 'default')
+
+
+@override_settings(KITCHEN_BOARD_VERSION_TTL_SECONDS=60)
+class KitchenBoardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='cook', is_staff=True))
+        category = Category.objects.create(name='Супи')
+        self.borsch = Dish.objects.create(name='Борщ', price='90.00', category=category)
+        self.soup = Dish.objects.create(name='Юшка', price='70.00', category=category)
+
+    def order(self, *items):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/orders/', {'items': [{'dish': dish.id, 'quantity': qty} for dish, qty in items]}, format='json'
+            )
+        return response.data['id']
+
+    def test_aggregates_open_orders_and_invalidates(self):
+        first = self.order((self.borsch, 2), (self.soup, 1))
+        self.order((self.borsch, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/orders/{first}/status/', {'status': 'IN_PROGRESS'}, format='json')
+
+        board = self.client.get('/api/kitchen/').data
+        self.assertEqual(board['open_orders'], 2)
+        borsch = board['dishes'][0]
+        self.assertEqual(
+            (borsch['name'], borsch['quantity'], borsch['new'], borsch['in_progress'], borsch['orders']),
+            ('Борщ', 3, 1, 2, 2),
+        )
+        self.assertEqual(board['dishes'][1]['name'], 'Юшка')
+        self.assertEqual([order['id'] for order in board['orders']], sorted(order['id'] for order in board['orders']))
+        self.assertEqual(borsch['oldest_order_date'], Order.objects.get(pk=first).date)
+        with self.assertNumQueries(0):
+            self.client.get('/api/kitchen/')
+        # кількості по стравах і список замовлень — один запит із віконними агрегатами
+        with self.assertNumQueries(1):
+            kitchen.build_board()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/orders/{first}/status/', {'status': 'COMPLETED'}, format='json')
+        board = self.client.get('/api/kitchen/').data
+        self.assertEqual(board['open_orders'], 1)
+        self.assertEqual([(dish['name'], dish['quantity']) for dish in board['dishes']], [('Борщ', 1)])
+
+    def test_change_in_other_worker_reaches_board(self):
+        first = self.order((self.borsch, 2))
+        self.assertEqual(self.client.get('/api/kitchen/').data['open_orders'], 1)
+
+        # інший воркер: статус і версія змінені в базі, кеш цього процесу про це не знає
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE menu_api_order SET status = 'COMPLETED' WHERE id = %s", [first])
+            cursor.execute('UPDATE menu_api_kitchenboardversion SET version = version + 1')
+        self.assertEqual(self.client.get('/api/kitchen/').data['open_orders'], 1)
+        later = time.monotonic() + 61
+        with unittest.mock.patch('menu_api.cache.time.monotonic', return_value=later):
+            self.assertEqual(self.client.get('/api/kitchen/').data['open_orders'], 0)
+
+
+class ReviewEligibilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='guest')
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+        self.order = Order.objects.create(user=self.user)
+        OrderItem.objects.create(order=self.order, dish=self.dish, quantity=1, price=self.dish.price)
+        self.client = APIClient()
+
+    def set_status(self, value):
+        self.client.force_authenticate(self.staff)
+        self.client.patch(f'/api/orders/{self.order.id}/status/', {'status': value}, format='json')
+
+    def review(self):
+        self.client.force_authenticate(self.user)
+        return self.client.post('/api/reviews/', {'dish': self.dish.id, 'rating': 5}, format='json')
+
+    def test_completion_grants_and_duplicate_is_rejected(self):
+        self.assertEqual(self.review().status_code, 400)
+
+        self.set_status('COMPLETED')
+        self.assertTrue(PurchasedDish.objects.filter(pk=(self.user.pk, self.dish.pk)).exists())
+        self.assertEqual(self.review().status_code, 201)
+
+        response = self.review()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], "Ви вже залишили відгук на цю страву.")
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.review_count, 1)
+
+    def test_reopening_order_revokes_and_backfill_restores(self):
+        self.set_status('COMPLETED')
+        self.set_status('IN_PROGRESS')
+        self.assertFalse(PurchasedDish.objects.exists())
+
+        Order.objects.filter(pk=self.order.pk).update(status='COMPLETED')
+        self.assertEqual(purchases.rebuild(), 1)
+        self.assertEqual(self.review().status_code, 201)
+
+
+class FastListRenderingTests(TestCase):
+    """Швидкий шлях списку страв дає ті самі байти, що й DishListSerializer + JSONRenderer."""
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Піца')
+        photo = 'dishes_photos/margherita.jpg'
+        Dish.objects.create(
+            name='Маргарита\u2028', description='сир', price='150.00', category=category, tags=TAG_BITS['VEGAN'],
+            photo=photo, photo_variants={
+                'source': photo,
+                **{variant: {'webp': f'dishes_photos/variants/{variant}.webp'} for variant in ('thumbnail', 'card', 'detail')},
+            },
+        )
+        Dish.objects.create(name='Пепероні', description='ковбаса', price='1234.50', category=category, rating='4.50')
+        Dish.objects.create(name='Стара', description='', price='99.99', category=category, photo='old.jpg', tags=TAG_BITS['MEAT'])
+
+    def test_parity_with_serializer(self):
+        for url in ('/api/dishes/', '/api/dishes/?q=пеп', '/api/dishes/?category=піца&max_price=200'):
+            cache.clear()
+            fast = self.client.get(url)
+            cache.clear()
+            with override_settings(FAST_LIST_RENDERING=False):
+                slow = self.client.get(url)
+            self.assertEqual(fast.content, slow.content, url)
+            self.assertEqual(fast['ETag'], slow['ETag'], url)
+
+    def test_renderer_parity(self):
+        data = DishDetailSerializer(
+            Dish.objects.prefetch_related('reviews'), many=True, context={'request': None},
+        ).data
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+@override_settings(MENU_VERSION_TTL_SECONDS=60)
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+        for i in range(7):
+            Review.objects.create(dish=self.dish, user=User.objects.create(username=f'user{i}'), rating=5)
+        order = Order.objects.create(user=self.staff)
+        OrderItem.objects.create(order=order, dish=self.dish, quantity=1, price=self.dish.price)
+
+    def get(self, url, queries):
+        cache.clear()
+        menu_cache.get_menu_version()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(len(ctx.captured_queries), queries, url)
+        return response, ' '.join(query['sql'] for query in ctx.captured_queries)
+
+    def test_dish_fields_prune_joins_and_prefetch(self):
+        response, sql = self.get('/api/dishes/?fields=id,name,price', 1)
+        self.assertEqual(response.json(), [{'id': self.dish.id, 'name': 'Борщ', 'price': '90.00'}])
+        self.assertNotIn('menu_api_category', sql)
+
+        response, sql = self.get(f'/api/dishes/{self.dish.id}/?fields=name', 1)
+        self.assertEqual(response.json(), {'id': self.dish.id, 'name': 'Борщ'})
+
+        response, _ = self.get(f'/api/dishes/{self.dish.id}/?fields=name&expand=reviews', 2)
+        self.assertEqual(set(response.json()), {'id', 'name', 'reviews'})
+
+    def test_detail_embeds_latest_reviews_with_count(self):
+        data = self.client.get(f'/api/dishes/{self.dish.id}/').json()
+        self.assertEqual(data['review_count'], 7)
+        self.assertEqual([review['user']['username'] for review in data['reviews']], [f'user{i}' for i in range(6, 1, -1)])
+
+    def test_order_fields(self):
+        self.client.force_authenticate(self.staff)
+        response, sql = self.get('/api/orders/?fields=id,status,sums', 1)
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'status', 'sums'})
+        self.assertNotIn('auth_user', sql)
+
+        response, _ = self.get('/api/orders/?fields=id&expand=items', 2)
+        self.assertEqual(response.json()['results'][0]['items'][0]['dish_name'], 'Борщ')
+
+
+@override_settings(MENU_VERSION_TTL_SECONDS=60)
+class MatcherTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        pizza = Category.objects.create(name='Піца')
+        self.margherita = Dish.objects.create(name='Піца Маргарита', description='томати, моцарела', price='150.00', category=pizza)
+        Dish.objects.create(name='Піца Пепероні', description='гостра ковбаса', price='170.00', category=pizza, tags=TAG_BITS['SPICY'])
+        Dish.objects.create(name="Солянка м'ясна", price='120.00', category=pizza, tags=TAG_BITS['MEAT'])
+        Dish.objects.create(name='Деруни', price='80.00', category=pizza, is_available=False)
+
+    def best(self, phrase):
+        results = self.client.get('/api/dishes/match/', {'q': phrase}).json()['results']
+        return (results[0]['match'], results[0]['dish']['name']) if results else None
+
+    def test_ukrainian_phrases(self):
+        self.assertEqual(self.best('ПІЦА МАРГАРИТА'), ('exact', 'Піца Маргарита'))
+        self.assertEqual(self.best('маргарита'), ('substring', 'Піца Маргарита'))
+        self.assertEqual(self.best('дві піци маргариту'), ('fuzzy', 'Піца Маргарита'))
+        self.assertEqual(self.best('солянку мясну'), ('fuzzy', "Солянка м'ясна"))
+        self.assertIsNone(self.best('деруни'))
+        self.assertIsNone(self.best('xyz'))
+
+    def test_index_follows_menu_version(self):
+        self.assertIsNone(self.best('вареники'))
+        Dish.objects.create(name='Вареники з картоплею', price='95.00', category=self.margherita.category)
+        self.assertEqual(self.best('вареників'), ('fuzzy', 'Вареники з картоплею'))
+
+    def test_edits_are_reflected(self):
+        self.assertEqual(self.best('маргарита'), ('substring', 'Піца Маргарита'))
+        self.margherita.name = 'Піца Чотири сири'
+        self.margherita.save()
+        self.assertEqual(self.best('чотири сири'), ('substring', 'Піца Чотири сири'))
+        self.assertIsNone(self.best('маргарита'))
+
+        # зміна з іншого воркера: в цьому процесі ні сигналу, ні кешу — лише версія в базі
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM menu_api_dish WHERE id = %s', [self.margherita.id])
+            cursor.execute('UPDATE menu_api_menuversion SET version = version + 1')
+        # індекс перебудується, щойно мине MENU_VERSION_TTL_SECONDS
+        self.assertEqual(self.best('чотири сири'), ('substring', 'Піца Чотири сири'))
+        later = time.monotonic() + 61
+        with unittest.mock.patch('menu_api.cache.time.monotonic', return_value=later):
+            self.assertIsNone(self.best('чотири сири'))
+
+    def test_lookup_does_not_touch_database(self):
+        self.best('піца')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/dishes/match/', {'q': 'піцу маргариту', 'limit': 2})
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(response.json()['results'][0]['dish']['id'], self.margherita.id)
+
+
+class TagMaskTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Піца')
+        Dish.objects.create(name='Пепероні', price='170.00', category=category, tags=TAG_BITS['SPICY'] | TAG_BITS['MEAT'])
+        Dish.objects.create(name='Дьябло', price='190.00', category=category, tags=TAG_BITS['SPICY'])
+        Dish.objects.create(name='Маргарита', price='150.00', category=category)
+
+    def names(self, query):
+        cache.clear()
+        return sorted(dish['name'] for dish in self.client.get(f'/api/dishes/?{query}').json())
+
+    def test_any_and_all(self):
+        self.assertEqual(self.names('tags=meat,sweet'), ['Пепероні'])
+        self.assertEqual(self.names('tags=spicy'), ['Дьябло', 'Пепероні'])
+        self.assertEqual(self.names('tags_all=spicy,meat'), ['Пепероні'])
+        self.assertEqual(self.names('tags=spicy&tags_all=meat'), ['Пепероні'])
+        self.assertEqual(self.names('tags=unknown'), [])
+        self.assertEqual(self.names('tags_all=spicy,unknown'), [])
+        with self.assertRaises(TypeError):
+            TagMaskLookup(F('tags'), TAG_BITS['SPICY'])
+
+    def test_labels_and_import(self):
+        data = {dish['name']: dish['tags'] for dish in self.client.get('/api/dishes/').json()}
+        self.assertEqual(data, {'Пепероні': ['Гостре', 'Мясне'], 'Дьябло': ['Гостре'], 'Маргарита': []})
+
+        menu_import.import_menu([
+            {'name': 'Маргарита', 'price': '150.00', 'category': 'Піца', 'tags': 'vegan, sweet'},
+            {'name': 'Пепероні', 'price': '170.00', 'category': 'Піца', 'tags': ['SPICY', 'MEAT']},
+        ])
+        self.assertEqual(Dish.objects.get(name='Маргарита').tags, TAG_BITS['VEGAN'] | TAG_BITS['SWEET'])
+        with self.assertRaises(ValidationError):
+            menu_import.import_menu([{'name': 'Борщ', 'price': '90.00', 'category': 'Супи', 'tags': 'HOT'}])
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        caches[idempotency.CACHE_ALIAS].clear()
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+        self.payload = {'items': [{'dish': self.dish.id, 'quantity': 2}]}
+
+    def post(self, key, payload=None, url='/api/orders/'):
+        return self.client.post(url, payload or self.payload, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        first = self.post('kiosk-1')
+        with self.assertNumQueries(0):
+            retry = self.post('kiosk-1')
+        self.assertEqual((retry.status_code, retry.json()), (201, first.json()))
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(self.post('kiosk-2').status_code, 201)
+        self.assertEqual(Order.objects.count(), 2)
+
+        other = self.post('kiosk-1', {'items': [{'dish': self.dish.id, 'quantity': 3}]})
+        self.assertEqual(other.status_code, 422)
+
+        batch = [self.payload, self.payload]
+        self.assertEqual(self.post('kiosk-1', batch, '/api/orders/batch/').status_code, 201)
+        self.assertEqual(self.post('kiosk-1', batch, '/api/orders/batch/').status_code, 201)
+        self.assertEqual(OrderItem.objects.count(), 4)
+
+    def test_errors_are_not_stored(self):
+        self.assertEqual(self.post('k', {'items': [{'dish': 999, 'quantity': 1}]}).status_code, 400)
+        self.assertEqual(self.post('k', {'items': [{'dish': self.dish.id, 'quantity': 1}]}).status_code, 201)
+
+    def in_flight(self, key):
+        request = SimpleNamespace(path='/api/orders/', user=AnonymousUser(), data=self.payload)
+        slot, body = idempotency.slot_key(request, key), idempotency.fingerprint(request)
+        return IdempotencyKey.objects.create(slot=slot, fingerprint=body)
+
+    def test_duplicate_waits_for_in_flight_request(self):
+        entry = self.in_flight('kiosk-1')
+
+        # "перший" запит в іншому воркері завершується, поки дублікат чекає: видно лише рядок у базі
+        def finish(seconds):
+            IdempotencyKey.objects.filter(pk=entry.pk).update(status_code=201, response={'id': 42})
+
+        with unittest.mock.patch('menu_api.idempotency.time.sleep', side_effect=finish) as sleep:
+            response = self.post('kiosk-1')
+        sleep.assert_called_once_with(idempotency.POLL_INTERVAL)
+        self.assertEqual((response.status_code, response.json()), (201, {'id': 42}))
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+        self.assertFalse(Order.objects.exists())
+
+    def test_wait_is_bounded(self):
+        self.in_flight('kiosk-1')
+        started = time.monotonic()
+        response = self.post('kiosk-1')
+        self.assertLess(time.monotonic() - started, settings.IDEMPOTENCY_WAIT_SECONDS + 1)
+        self.assertEqual((response.status_code, response['Retry-After']), (409, '1'))
+        self.assertFalse(Order.objects.exists())
+
+    def test_stale_keys_are_released(self):
+        # власник ключа впав посеред запиту
+        entry = self.in_flight('kiosk-1')
+        IdempotencyKey.objects.filter(pk=entry.pk).update(
+            date=timezone.now() - timedelta(seconds=idempotency.IN_FLIGHT_TIMEOUT + 1),
+        )
+        self.assertEqual(self.post('kiosk-1').status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+
+        old = timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS + 1)
+        IdempotencyKey.objects.update(date=old)
+        self.assertEqual(self.post('kiosk-2').status_code, 201)
+        out = io.StringIO()
+        call_command('prune_idempotency_keys', stdout=out)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+        self.assertIn('1', out.getvalue())
+
+
+class ThrottleTests(TestCase):
+    RATES = {'orders.ip': '2/min', 'login.ip': '100/min', 'login.user': '2/min'}
+
+    def setUp(self):
+        metrics.registry.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        rates = override_settings(
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': self.RATES},
+            THROTTLE_STORE=Path(tmp.name) / 'throttle.sqlite3',
+        )
+        rates.enable()
+        self.addCleanup(rates.disable)
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+
+    def test_bucket_refills_over_time(self):
+        store = throttling.get_store()
+        self.assertEqual([store.take('k', 2, 1.0, now=0)[0] for _ in range(3)], [True, True, False])
+        self.assertEqual(store.take('k', 2, 1.0, now=0.5), (False, 0.5))
+        self.assertEqual(store.take('k', 2, 1.0, now=1.0), (True, 0.0))
+
+    def test_subclass_must_identify_client(self):
+        with self.assertRaises(TypeError):
+            type('Incomplete', (throttling.TokenBucketThrottle,), {'kind': 'ip'})()
+
+    def test_orders_per_ip(self):
+        def post(ip):
+            return self.client.post(
+                '/api/orders/', {'items': [{'dish': self.dish.id, 'quantity': 1}]},
+                content_type='application/json', REMOTE_ADDR=ip,
+            )
+
+        self.assertEqual([post('10.0.0.1').status_code for _ in range(3)], [201, 201, 429])
+        self.assertEqual(int(post('10.0.0.1')['Retry-After']), 30)
+        self.assertEqual(post('10.0.0.2').status_code, 201)
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(self.client.get('/api/orders/').status_code, 401)
+
+    def test_login_per_username_and_counters(self):
+        User.objects.create_user('olena', password='secret')
+        for i, expected in enumerate([200, 400, 429]):
+            response = self.client.post(
+                # відро спільне для olena / Olena, хоч логін і чутливий до регістру
+                '/api/login/', {'username': 'Olena' if i else 'olena', 'password': 'secret' if i == 0 else 'wrong'},
+                REMOTE_ADDR=f'10.0.0.{i}',
+            )
+            self.assertEqual(response.status_code, expected)
+        self.assertTrue(response.has_header('Retry-After'))
+
+        rendered = metrics.registry.render()
+        self.assertIn('throttle_decisions_total{scope="login.user",result="rejected"} 1', rendered)
+        self.assertIn('throttle_decisions_total{scope="login.ip",result="allowed"} 3', rendered)
+
+
+class MenuImportTests(TestCase):
+    CSV = (
+        'name,description,price,category,is_available,tags\n'
+        'Борщ,з пампушками,120.00,Супи,true,MEAT\n'
+        'Салат,овочі,80,Салати,1,\n'
+        'Піца,сир,200,Піца,false,SPICY\n'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='staff', is_staff=True))
+        Dish.objects.create(name='Піца', description='сир', price='150.00', category=Category.objects.create(name='Піца'))
+
+    def upload(self, content, name='menu.csv', query=''):
+        return self.client.post(
+            f'/api/dishes/import/{query}', {'file': SimpleUploadedFile(name, content)}, format='multipart',
+        )
+
+    def test_dry_run_reports_without_writing(self):
+        response = self.upload(self.CSV.encode(), query='?dry_run=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'created': ['Борщ', 'Салат'],
+            'updated': {'Піца': ['price', 'is_available', 'tags']},
+            'unchanged': 0,
+            'dry_run': True,
+        })
+        self.assertEqual(Dish.objects.count(), 1)
+        self.assertFalse(Category.objects.filter(name='Супи').exists())
+
+    def test_upserts_by_name(self):
+        self.assertEqual(self.upload(self.CSV.encode()).status_code, 201)
+        self.assertEqual(
+            sorted(Dish.objects.values_list('name', 'price', 'category__name', 'is_available', 'tags')),
+            [
+                ('Борщ', Decimal('120.00'), 'Супи', True, TAG_BITS['MEAT']),
+                ('Піца', Decimal('200.00'), 'Піца', False, TAG_BITS['SPICY']),
+                ('Салат', Decimal('80.00'), 'Салати', True, 0),
+            ],
+        )
+        self.assertEqual(Category.objects.count(), 3)
+
+        again = self.upload(self.CSV.encode()).json()
+        self.assertEqual((again['created'], again['updated'], again['unchanged']), ([], {}, 3))
+
+    def test_duplicate_rows_and_bad_input_are_rejected(self):
+        duplicated = self.CSV + 'Борщ,інший,130,Супи,true,\n'
+        response = self.upload(duplicated.encode())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Борщ', response.json()['detail'])
+
+        response = self.client.post('/api/dishes/import/', [{'name': 'Юшка', 'price': '-1', 'category': 'Супи'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('price', response.json()['0'])
+        self.assertEqual(self.client.post('/api/dishes/import/', {'name': 'Юшка'}, format='json').status_code, 400)
+        self.assertEqual(Dish.objects.count(), 1)
+
+        self.assertEqual(APIClient().post('/api/dishes/import/', [], format='json').status_code, 401)
+
+    def test_unreadable_files_are_bad_requests(self):
+        for content, name in (
+            (b'[{"name": "\xd0\x91\xd0', 'menu.json'),
+            ('{"name": "Борщ"}'.encode(), 'menu.json'),
+            ('name,price,category\nБорщ,90,Супи\n'.encode('cp1251'), 'menu.csv'),
+        ):
+            response = self.upload(content, name)
+            self.assertEqual(response.status_code, 400, name)
+            self.assertIn('detail', response.json())
+        self.assertEqual(Dish.objects.count(), 1)
+
+
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+        self.users = [User.objects.create(username=f'user{i}') for i in range(3)]
+
+    def counters(self):
+        return Dish.objects.values_list('review_count', 'rating_sum', 'rating').get(pk=self.dish.pk)
+
+    def test_create_edit_delete(self):
+        first = Review.objects.create(dish=self.dish, user=self.users[0], rating=5)
+        Review.objects.create(dish=self.dish, user=self.users[1], rating=2)
+        self.assertEqual(self.counters(), (2, 7, Decimal('3.50')))
+
+        first.rating = 4
+        first.save()
+        self.assertEqual(self.counters(), (2, 6, Decimal('3.00')))
+
+        other = Dish.objects.create(name='Юшка', price='70.00', category=self.dish.category)
+        first.dish = other
+        first.save()
+        self.assertEqual(self.counters(), (1, 2, Decimal('2.00')))
+
+        Review.objects.filter(dish=self.dish).delete()
+        self.assertEqual(self.counters(), (0, 0, Decimal('0.00')))
+
+    def test_stale_dish_save_keeps_counters(self):
+        stale = Dish.objects.get(pk=self.dish.pk)
+        Review.objects.create(dish=self.dish, user=self.users[0], rating=2)
+        stale.price = '95.00'
+        stale.save()
+        self.assertEqual(self.counters(), (1, 2, Decimal('2.00')))
+        self.assertEqual(Dish.objects.get(pk=self.dish.pk).price, Decimal('95.00'))
+
+    def test_api_cannot_write_rating(self):
+        Review.objects.create(dish=self.dish, user=self.users[0], rating=2)
+        response = APIClient().patch(
+            f'/api/dishes/{self.dish.pk}/', {'rating': '4.90', 'review_count': 9, 'name': 'Борщ!'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counters(), (1, 2, Decimal('2.00')))
+
+    def test_recompute_command(self):
+        for user, rating in zip(self.users, (5, 4, 4)):
+            Review.objects.create(dish=self.dish, user=user, rating=rating)
+        Dish.objects.filter(pk=self.dish.pk).update(review_count=0, rating_sum=0, rating=0)
+        out = io.StringIO()
+        call_command('recompute_ratings', stdout=out)
+        self.assertEqual(self.counters(), (3, 13, Decimal('4.33')))
+        self.assertIn('1', out.getvalue())
+
+
+class DateCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='guest')
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.json()['results']]
+            url, pages = response.json()['next'], pages + 1
+        return ids, pages
+
+    def test_orders_walk_all_pages_with_equal_dates(self):
+        # п'ять замовлень з однаковою датою: межа сторінки падає всередину групи
+        now = timezone.now()
+        orders = [Order.objects.create(user=self.user) for _ in range(7)]
+        Order.objects.filter(pk__in=[o.pk for o in orders[:5]]).update(date=now)
+        Order.objects.filter(pk=orders[5].pk).update(date=now - timedelta(days=1))
+        Order.objects.filter(pk=orders[6].pk).update(date=now + timedelta(days=1))
+
+        ids, pages = self.walk('/api/orders/?page_size=2')
+        expected = list(Order.objects.order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 4)
+        self.assertEqual(ids[0], orders[6].pk)
+        self.assertEqual(ids[-1], orders[5].pk)
+
+    def test_page_size_is_capped(self):
+        Order.objects.bulk_create([Order(user=self.user) for _ in range(DateCursorPagination.max_page_size + 5)])
+        response = self.client.get('/api/orders/?page_size=1000')
+        self.assertEqual(len(response.json()['results']), DateCursorPagination.max_page_size)
+        self.assertIsNotNone(response.json()['next'])
+        response = self.client.get('/api/orders/')
+        self.assertEqual(len(response.json()['results']), DateCursorPagination.page_size)
+
+    def test_reviews_walk_in_date_order(self):
+        now = timezone.now()
+        for i in range(5):
+            review = Review.objects.create(dish=self.dish, user=User.objects.create(username=f'user{i}'), rating=5)
+            Review.objects.filter(pk=review.pk).update(date=now - timedelta(hours=i // 2))
+
+        ids, pages = self.walk(f'/api/dishes/{self.dish.pk}/reviews/?page_size=2')
+        expected = list(Review.objects.order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(set(ids)), 5)
+        self.assertEqual(pages, 3)
+
+
+@unittest.skipUnless(search.is_supported(), 'FTS5 є лише в SQLite')
+class SearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='Піца')
+
+    def dish(self, name, description='', **kwargs):
+        return Dish.objects.create(name=name, description=description, price='100.00', category=self.category, **kwargs)
+
+    def found(self, query, url='/api/dishes/', **params):
+        response = APIClient().get(url, {'q': query, **params})
+        return [row['name'] for row in response.json()]
+
+    def test_name_outranks_description(self):
+        self.dish('Салат', 'до піца-вечора')
+        self.dish('Піца Маргарита')
+        self.assertEqual(self.found('піца'), ['Піца Маргарита', 'Салат'])
+
+    def test_prefix_and_diacritics(self):
+        self.dish('Crème brûlée')
+        self.dish('Борщ український')
+        self.assertEqual(self.found('creme brulee'), ['Crème brûlée'])
+        self.assertEqual(self.found('бор укр'), ['Борщ український'])
+        self.assertEqual(self.found('щ'), [])
+
+    def test_index_follows_save_and_delete(self):
+        dish = self.dish('Вареники')
+        self.assertEqual(search.search_ids('вареники'), [dish.pk])
+        dish.name = 'Пельмені'
+        dish.save()
+        self.assertEqual(search.search_ids('вареники'), [])
+        self.assertEqual(search.search_ids('пельмені'), [dish.pk])
+        dish.delete()
+        self.assertEqual(search.search_ids('пельмені'), [])
+
+    def test_limit_applies_after_filters(self):
+        # три недоступні страви ранжуються вище, але не мають забрати місце доступної
+        for i in range(3):
+            self.dish(f'Піца {i}', is_available=False)
+        self.dish('Салат', 'до піца-вечора')
+        with unittest.mock.patch.object(search, 'SEARCH_LIMIT', 2):
+            self.assertEqual(self.found('піца'), ['Салат'])
+            self.assertEqual(self.found('піца', url='/api/async/dishes/'), ['Салат'])
+            self.assertEqual(self.found('піца', max_price='50'), [])
+
+
+class OrderEventTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        self.guest = User.objects.create(username='guest')
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+        self.client = APIClient()
+
+    def create_order(self):
+        response = self.client.post('/api/orders/', {'items': [{'dish': self.dish.id, 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def stream(self, user=None, stream_token=None, params=None, **extra):
+        params = {'stream_token': stream_token or events.issue_stream_token(user or self.staff), **(params or {})}
+        response = self.client.get('/api/orders/events/', params, **extra)
+        if response.status_code != 200:
+            return response.status_code, []
+        body = b''.join(response.streaming_content).decode()
+        return 200, [int(line[len('id: '):]) for line in body.splitlines() if line.startswith('id: ')]
+
+    def test_publish_on_create_and_status(self):
+        order_id = self.create_order()
+        self.client.force_authenticate(self.staff)
+        self.client.patch(f'/api/orders/{order_id}/status/', {'status': 'IN_PROGRESS'}, format='json')
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            list(OrderEvent.objects.order_by('id').values_list('order_id', 'kind', 'payload__status')),
+            [(order_id, events.ORDER_CREATED, 'NEW'), (order_id, events.ORDER_STATUS, 'IN_PROGRESS')],
+        )
+
+    def test_resume_from_last_event_id(self):
+        for _ in range(3):
+            self.create_order()
+        first, second, third = OrderEvent.objects.order_by('id').values_list('id', flat=True)
+        self.assertEqual(self.stream(HTTP_LAST_EVENT_ID=str(first)), (200, [second, third]))
+        self.assertEqual(self.stream(params={'last_event_id': second}), (200, [third]))
+        # без курсора — лише події після підключення
+        self.assertEqual(self.stream(), (200, []))
+
+    def test_stream_is_scoped_to_active_staff(self):
+        self.create_order()
+        cursor = {'HTTP_LAST_EVENT_ID': '0'}
+        self.assertEqual(self.stream(**cursor)[0], 200)
+        self.assertEqual(self.stream(self.guest, **cursor)[0], 403)
+        self.assertEqual(self.stream(stream_token=events.issue_stream_token(self.staff) + 'x', **cursor)[0], 403)
+        with override_settings(ORDER_STREAM_TOKEN_SECONDS=-1):
+            self.assertEqual(self.stream(**cursor)[0], 403)
+
+        # довгоживучий API-токен у URL більше не приймається
+        key = Token.objects.create(user=self.staff).key
+        self.assertEqual(self.client.get('/api/orders/events/', {'token': key}).status_code, 403)
+
+        User.objects.filter(pk=self.staff.pk).update(is_active=False)
+        self.assertEqual(self.stream(**cursor)[0], 403)
+
+    def test_stream_token_endpoint(self):
+        url = '/api/orders/events/token/'
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.client.post(url).status_code, 403)
+        self.client.force_authenticate(self.staff)
+        response = self.client.post(url)
+        self.assertEqual(response.json()['expires_in'], settings.ORDER_STREAM_TOKEN_SECONDS)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.stream(stream_token=response.json()['stream_token'])[0], 200)
+
+    def test_prune_keeps_recent_events(self):
+        for _ in range(3):
+            self.create_order()
+        old = timezone.now() - timedelta(hours=settings.ORDER_EVENT_RETENTION_HOURS + 1)
+        OrderEvent.objects.filter(pk__in=OrderEvent.objects.order_by('id').values('id')[:2]).update(date=old)
+        out = io.StringIO()
+        call_command('prune_order_events', stdout=out)
+        self.assertEqual(OrderEvent.objects.count(), 1)
+        self.assertIn('2', out.getvalue())
+
+        OrderEvent.objects.update(date=old)
+        with unittest.mock.patch.object(events, 'PRUNE_EVERY', 1):
+            self.create_order()
+        self.assertEqual(OrderEvent.objects.count(), 1)
+        self.assertGreater(OrderEvent.objects.get().date, old)
+
+
+class PhotoVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.dish = Dish.objects.create(name='Борщ', price='90.00', category=Category.objects.create(name='Супи'))
+
+    def photo(self, name, size):
+        path = Path(self.media_root, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        Image.new('RGB', size, 'red').save(path, 'PNG')
+        return name
+
+    def test_generate_variants(self):
+        name = self.photo('dishes_photos/borsch.png', (2000, 1000))
+        variants = images.generate_variants(self.media_root, name)
+
+        self.assertEqual(variants['source'], name)
+        digest = images.content_hash(Path(self.media_root, name))
+        for variant, width in images.VARIANTS.items():
+            self.assertEqual(set(variants[variant]), set(images.FORMATS))
+            for ext, relative in variants[variant].items():
+                self.assertEqual(relative, f'{images.VARIANT_DIR}/{digest}-{variant}.{ext}')
+                with Image.open(Path(self.media_root, relative)) as image:
+                    self.assertEqual(image.size, (width, width // 2))
+        self.assertEqual(list(Path(self.media_root, images.VARIANT_DIR).glob('*.tmp')), [])
+
+        # готові файли не перегенеровуються
+        detail = Path(self.media_root, variants['detail']['webp'])
+        mtime = detail.stat().st_mtime_ns
+        self.assertEqual(images.generate_variants(self.media_root, name), variants)
+        self.assertEqual(detail.stat().st_mtime_ns, mtime)
+
+    def test_small_photo_is_not_upscaled(self):
+        name = self.photo('small.png', (100, 80))
+        variants = images.generate_variants(self.media_root, name)
+        with Image.open(Path(self.media_root, variants['detail']['jpeg'])) as image:
+            self.assertEqual(image.size, (100, 80))
+
+    def test_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            images.generate_variants(self.media_root, 'dishes_photos/missing.png')
+
+        Dish.objects.filter(pk=self.dish.pk).update(photo='dishes_photos/missing.png')
+        future = Future()
+        future.set_exception(FileNotFoundError('missing.png'))
+        with self.assertLogs('menu_api.images', 'ERROR'):
+            images._store_variants(self.dish.pk, 'dishes_photos/missing.png', future)
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.photo_variants, {})
+
+    def test_store_only_for_current_photo(self):
+        variants = {'source': 'new.png', 'card': {'webp': 'dishes_photos/variants/x-card.webp'}}
+        Dish.objects.filter(pk=self.dish.pk).update(photo='new.png')
+        future = Future()
+        future.set_result(variants)
+        # у тестовій транзакції з'єднання закривати не можна
+        with unittest.mock.patch.object(connection, 'close'):
+            images._store_variants(self.dish.pk, 'old.png', future)
+            self.dish.refresh_from_db()
+            self.assertEqual(self.dish.photo_variants, {})
+            version = menu_cache.get_menu_version()
+            images._store_variants(self.dish.pk, 'new.png', future)
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.photo_variants, variants)
+        self.assertGreater(menu_cache.get_menu_version(), version)
+
+    def test_save_schedules_variants_once(self):
+        with unittest.mock.patch.object(images, 'schedule_variants') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.dish.photo = 'dishes_photos/borsch.png'
+                self.dish.save()
+            schedule.assert_called_once_with(self.dish.pk, str(settings.MEDIA_ROOT), 'dishes_photos/borsch.png')
+
+            Dish.objects.filter(pk=self.dish.pk).update(photo_variants={'source': 'dishes_photos/borsch.png'})
+            self.dish.refresh_from_db()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.dish.save()
+            schedule.assert_called_once()
+
+    def test_photo_variant_urls(self):
+        request = RequestFactory().get('/api/dishes/')
+        variants = {'source': 'p.png', 'thumbnail': {'webp': 'dishes_photos/variants/h-thumbnail.webp'}}
+        self.assertEqual(
+            photo_variant_urls('p.png', variants, request),
+            {
+                'thumbnail': {'webp': 'http://testserver/media/dishes_photos/variants/h-thumbnail.webp'},
+                'card': {},
+                'detail': {},
+            },
+        )
+        # фото замінили, а варіанти ще від старого — або фото немає зовсім
+        self.assertIsNone(photo_variant_urls('other.png', variants, request))
+        self.assertIsNone(photo_variant_urls(None, variants, request))
+        self.assertIsNone(photo_variant_urls('p.png', {}, request))
+
+        Dish.objects.filter(pk=self.dish.pk).update(photo='p.png', photo_variants=variants)
+        cache.clear()
+        detail = self.client.get(f'/api/dishes/{self.dish.pk}/').json()
+        self.assertEqual(
+            detail['photo_variants']['thumbnail'],
+            {'webp': 'http://testserver/media/dishes_photos/variants/h-thumbnail.webp'},
+        )
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create(username='staff', is_staff=True))
+        category = Category.objects.create(name='Супи')
+        self.borsch = Dish.objects.create(name='Борщ', price='90.00', category=category)
+        self.soup = Dish.objects.create(name='Юшка', price='70.00', category=category)
+
+    def order(self, *items):
+        response = self.client.post(
+            '/api/orders/', {'items': [{'dish': dish.id, 'quantity': qty} for dish, qty in items]}, format='json'
+        )
+        return response.json()['id']
+
+    def set_status(self, order_id, value):
+        response = self.client.patch(f'/api/orders/{order_id}/status/', {'status': value}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def rollups(self):
+        return set(DailyDishSales.objects.values_list('dish__name', 'quantity', 'revenue', 'order_count'))
+
+    def test_completion_adds_and_reopening_subtracts(self):
+        first = self.order((self.borsch, 2), (self.soup, 1))
+        second = self.order((self.borsch, 1))
+        self.assertEqual(self.rollups(), set())
+
+        self.set_status(first, 'COMPLETED')
+        self.set_status(second, 'COMPLETED')
+        self.assertEqual(self.rollups(), {('Борщ', 3, Decimal('270.00'), 2), ('Юшка', 1, Decimal('70.00'), 1)})
+        self.assertEqual(DailyDishSales.objects.get(dish=self.borsch).day, timezone.localdate())
+
+        # COMPLETED -> COMPLETED нічого не додає
+        self.set_status(first, 'COMPLETED')
+        self.set_status(first, 'IN_PROGRESS')
+        self.assertEqual(self.rollups(), {('Борщ', 1, Decimal('90.00'), 1), ('Юшка', 0, Decimal('0.00'), 0)})
+
+        self.set_status(first, 'COMPLETED')
+        incremental = self.rollups()
+        self.assertEqual(analytics.rebuild(), 2)
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_subtract_never_goes_negative(self):
+        order_id = self.order((self.borsch, 2))
+        Order.objects.filter(pk=order_id).update(status='COMPLETED')
+        # замовлення завершили ще до появи підсумків: рядка немає, потім він менший
+        self.set_status(order_id, 'NEW')
+        self.assertEqual(self.rollups(), set())
+
+        DailyDishSales.objects.create(
+            day=timezone.localdate(), dish=self.borsch, category=self.borsch.category,
+            quantity=1, revenue='90.00', order_count=1,
+        )
+        Order.objects.filter(pk=order_id).update(status='COMPLETED')
+        self.set_status(order_id, 'NEW')
+        self.assertEqual(self.rollups(), {('Борщ', 0, Decimal('0.00'), 0)})
+
+    def test_revenue_stays_exact(self):
+        self.borsch.price = Decimal('0.10')
+        self.borsch.save()
+        for _ in range(3):
+            self.set_status(self.order((self.borsch, 1)), 'COMPLETED')
+        # 0.1 + 0.1 + 0.1 у float — 0.30000000000000004: у базі не лишається хвоста
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT revenue FROM menu_api_dailydishsales WHERE dish_id = %s', [self.borsch.pk])
+            self.assertEqual(Decimal(str(cursor.fetchone()[0])), Decimal('0.3'))
+        self.assertEqual(DailyDishSales.objects.get(dish=self.borsch).revenue, Decimal('0.30'))
+        self.assertEqual(self.client.get('/api/analytics/sales/').json()['totals']['revenue'], '0.30')
+
+    def test_rebuild_is_atomic(self):
+        self.set_status(self.order((self.borsch, 2)), 'COMPLETED')
+        with unittest.mock.patch.object(DailyDishSales.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                analytics.rebuild()
+        self.assertEqual(self.rollups(), {('Борщ', 2, Decimal('180.00'), 1)})
+
+    def test_report_reads_rollups(self):
+        self.set_status(self.order((self.borsch, 2), (self.soup, 1)), 'COMPLETED')
+        report = self.client.get('/api/analytics/sales/').json()
+        self.assertEqual(report['totals'], {'quantity': 3, 'revenue': '250.00'})
+        self.assertEqual(
+            [(dish['name'], dish['revenue'], dish['orders']) for dish in report['top_dishes']],
+            [('Борщ', '180.00', 1), ('Юшка', '70.00', 1)],
+        )
+        self.assertEqual(report['by_day'], [{'day': timezone.localdate().isoformat(), 'quantity': 3, 'revenue': '250.00'}])
+        empty = self.client.get('/api/analytics/sales/', {'date_to': '2020-01-01'}).json()
+        self.assertEqual(empty['totals'], {'quantity': 0, 'revenue': '0.00'})
+        self.assertEqual(self.client.get('/api/analytics/sales/', {'date_from': 'вчора'}).status_code, 400)
+
+
+class OrderExportTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create(username='staff', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+        dish = Dish.objects.create(name='Борщ, великий', price='90.00', category=Category.objects.create(name='Супи'))
+        self.order = Order.objects.create(user=self.staff, sums='180.00')
+        OrderItem.objects.create(order=self.order, dish=dish, quantity=2, price='90.00')
+        self.empty = Order.objects.create()
+
+    def export(self, fmt, **params):
+        response = self.client.get('/api/orders/export/', {'format': fmt, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        rows = list(csv.reader(io.StringIO(self.export('csv'))))
+        self.assertEqual(tuple(rows[0]), exports.CSV_HEADER)
+        self.assertEqual(rows[1], [
+            str(self.order.id), self.order.date.isoformat(), 'NEW', str(self.staff.id), 'staff', '180.00',
+            str(self.order.items.get().dish_id), 'Борщ, великий', '2', '90.00',
+        ])
+        self.assertEqual(rows[2][:6], [str(self.empty.id), self.empty.date.isoformat(), 'NEW', '', '', '0.00'])
+        self.assertEqual(rows[2][6:], ['', '', '', ''])
+        self.assertEqual(len(rows), 3)
+
+    def test_ndjson(self):
+        lines = [json.loads(line) for line in self.export('ndjson').splitlines()]
+        self.assertEqual([line['id'] for line in lines], [self.order.id, self.empty.id])
+        self.assertEqual(lines[0]['items'], [
+            {'dish': self.order.items.get().dish_id, 'dish_name': 'Борщ, великий', 'quantity': 2, 'price': '90.00'},
+        ])
+        self.assertEqual((lines[1]['user_id'], lines[1]['items']), (None, []))
+
+    def test_date_filters_and_access(self):
+        Order.objects.filter(pk=self.empty.pk).update(date=timezone.now() - timedelta(days=10))
+        today = timezone.localdate().isoformat()
+        self.assertEqual(len(self.export('ndjson', date_from=today).splitlines()), 1)
+        self.assertEqual(self.client.get('/api/orders/export/', {'date_to': '10.10.2026'}).status_code, 400)
+        self.client.force_authenticate(User.objects.create(username='guest'))
+        self.assertEqual(self.client.get('/api/orders/export/').status_code, 403)
+
+    def test_iterates_in_chunks(self):
+        Order.objects.bulk_create([Order() for _ in range(3)])
+        expected = list(Order.objects.order_by('id').values_list('id', flat=True))
+        # 5 замовлень порціями по 2: три порції по два запити і порожній запит наприкінці
+        with self.assertNumQueries(7):
+            exported = [order['id'] for order, items in exports.iter_orders(chunk_size=2)]
+        self.assertEqual(exported, expected)
@@ -0,0 +1,141 @@
+"""
+Token bucket для анонімних ендпоінтів: створення замовлень, реєстрація, логін.
+
+Стан відер — в окремому SQLite-файлі (THROTTLE_STORE), спільному для всіх воркерів
+на машині, а не в основній базі. Одна перевірка — один UPSERT ... RETURNING по
+первинному ключу відра: доливає токени за час, що минув, і знімає один, якщо є.
+Рядків не додається на кожен запит, лише на нове відро; журнал — WAL без fsync
+(втрата стану лімітів після падіння машини нічого не ламає).
+
+Ліміти — у REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] під ключами
+"<throttle_scope view>.<ip|user>": "30/min" — відро на 30 токенів, що наповнюється
+з нуля до повного за хвилину.
+"""
+import abc
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+# раз на стільки перевірок прибираємо відра, що давно стоять повними
+PURGE_EVERY = 1000
+PURGE_AFTER_SECONDS = 24 * 60 * 60
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+TAKE_SQL = '''
+INSERT INTO bucket (key, tokens, allowed, updated) VALUES (:key, :capacity - 1, 1, :now)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = min(:capacity, tokens + (:now - updated) * :rate)
+        - (min(:capacity, tokens + (:now - updated) * :rate) >= 1),
+    allowed = min(:capacity, tokens + (:now - updated) * :rate) >= 1,
+    updated = :now
+RETURNING tokens, allowed
+'''
+
+
+class BucketStore:
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._calls = 0
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, allowed INTEGER NOT NULL, updated REAL NOT NULL'
+                ') WITHOUT ROWID'
+            )
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, rate, now=None):
+        """Знімає токен з відра key. (чи дозволено, скільки секунд до наступного токена)."""
+        now = time.time() if now is None else now
+        conn = self.connection()
+        tokens, allowed = conn.execute(
+            TAKE_SQL, {'key': key, 'capacity': capacity, 'rate': rate, 'now': now},
+        ).fetchone()
+
+        self._calls += 1
+        if self._calls % PURGE_EVERY == 0:
+            conn.execute('DELETE FROM bucket WHERE updated < ?', (now - PURGE_AFTER_SECONDS,))
+        return bool(allowed), 0.0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        self.connection().execute('DELETE FROM bucket')
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    path = str(settings.THROTTLE_STORE)
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(path, BucketStore(path))
+    return store
+
+
+class TokenBucketThrottle(BaseThrottle, metaclass=abc.ABCMeta):
+    """
+    Базовий клас: view задає throttle_scope, підклас — чим ідентифікувати клієнта.
+    Немає ліміту в налаштуваннях або ідентифікатора — запит не обмежується.
+    """
+    kind = None
+
+    def __init__(self):
+        self.retry_after = None
+
+    @abc.abstractmethod
+    def get_ident_key(self, request, view):
+        """Ідентифікатор клієнта для ключа відра; None — запит не обмежується."""
+
+    def allow_request(self, request, view):
+        scope = f'{getattr(view, "throttle_scope", None)}.{self.kind}'
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        ident = self.get_ident_key(request, view)
+        if rate is None or ident is None:
+            return True
+
+        # той самий формат, що й у DRF: "30/min" — місткість 30, поповнення 30 за хвилину
+        count, period = rate.split('/')
+        capacity = int(count)
+        allowed, self.retry_after = get_store().take(f'{scope}:{ident}', capacity, capacity / PERIODS[period[0]])
+        metrics.registry.record_throttle(scope, allowed)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPBucketThrottle(TokenBucketThrottle):
+    kind = 'ip'
+
+    def get_ident_key(self, request, view):
+        # REMOTE_ADDR або X-Forwarded-For з урахуванням NUM_PROXIES
+        return self.get_ident(request)
+
+
+class UserBucketThrottle(TokenBucketThrottle):
+    """Автентифікований користувач, а для логіну — ім'я, під яке намагаються увійти."""
+    kind = 'user'
+
+    def get_ident_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'id:{request.user.pk}'
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if isinstance(username, str) and username.strip():
+            return f'name:{username.strip().lower()}'
+        return None
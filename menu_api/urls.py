@@ -1,6 +1,10 @@
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
+from .events import order_events
+from .metrics import MetricsAPIView
+
 from .views import (
     DishViewSet,
     OrderViewSet,
@@ -9,6 +13,10 @@ from .views import (
     RegisterAPIView,
     LoginAPIView,
     DishReviewsListAPIView,     # ← додано
+    SalesAnalyticsAPIView,
+    KitchenBoardAPIView,
+    OrderEventTokenAPIView,
+    OrderExportAPIView,
 )
 
 router = DefaultRouter()
@@ -18,8 +26,19 @@ router.register(r"orders", OrderViewSet, basename="order")
 urlpatterns = [
     path("register/", RegisterAPIView.as_view(), name="register"),
     path("login/", LoginAPIView.as_view(), name="login"),
+    path("orders/events/", order_events, name="order-events"),
+    path("orders/events/token/", OrderEventTokenAPIView.as_view(), name="order-events-token"),
+    path("orders/export/", OrderExportAPIView.as_view(), name="order-export"),
     path("orders/<int:pk>/status/", OrderStatusUpdateAPIView.as_view(), name="order-status-update"),
     path("reviews/", ReviewCreateAPIView.as_view(), name="review-create"),
+    path("kitchen/", KitchenBoardAPIView.as_view(), name="kitchen-board"),
+    path("analytics/sales/", SalesAnalyticsAPIView.as_view(), name="sales-analytics"),
+    path("metrics/", MetricsAPIView.as_view(), name="metrics"),
+
+    # async-дублікати читаючих ендпоінтів меню (для ASGI-сервера)
+    path("async/dishes/", async_views.dish_list, name="async-dish-list"),
+    path("async/dishes/<int:pk>/", async_views.dish_detail, name="async-dish-detail"),
+    path("async/dishes/<int:dish_id>/reviews/", async_views.dish_reviews, name="async-dish-reviews"),
 
     # ← новий ендпоінт для GET /api/dishes/<id>/reviews/
     path(
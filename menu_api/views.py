@@ -1,50 +1,215 @@
 from rest_framework.authtoken.models import Token
-from .models import Dish, Order, OrderItem, Review, Category
+from .models import TAG_BITS, Dish, Order, OrderItem, PurchasedDish, Review, Category, tag_mask
 from rest_framework import viewsets, generics, permissions, status, serializers
+from rest_framework.decorators import action
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.db.models import Q
+from django.db.models import Case, IntegerField, Prefetch, Q, Value, When
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from . import analytics
+from . import cache as menu_cache
+from . import events
+from . import exports
+from . import idempotency
+from . import kitchen
+from . import matcher
+from . import menu_import
+from . import purchases
+from . import search
+from .throttling import IPBucketThrottle, UserBucketThrottle
+from .pagination import DateCursorPagination
+from .renderers import FastJSONRenderer
 from .serializers import (
     DishListSerializer, DishDetailSerializer, OrderSerializer,
-    ReviewSerializer, RegisterSerializer, UserSerializer
+    ReviewSerializer, RegisterSerializer, SalesReportSerializer, UserSerializer, EMBEDDED_REVIEWS, dish_list_rows
 )
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
 
 
+def filter_dishes(queryset, params):
+    """
+    Фільтри меню ?category= ?max_price= ?tags= ?tags_all= (спільні для sync і async views).
+    ?tags=SPICY,MEAT — хоча б один із тегів, ?tags_all=SPICY,MEAT — усі разом.
+    """
+    category_name = params.get('category')
+    max_price = params.get('max_price')
+
+    if category_name:
+        # iexact на SQLite — це LIKE без індексу; lower(name) = lower(?) іде по category_name_lower_idx
+        categories = Category.objects.annotate(name_lower=Lower('name')).filter(
+            name_lower=Lower(Value(category_name))
+        )
+        queryset = queryset.filter(category__in=categories)
+
+    if max_price:
+        try:
+            max_price = float(max_price)
+            queryset = queryset.filter(price__lte=max_price)
+        except ValueError:
+            pass
+
+    for param, lookup in (('tags', 'tags__any'), ('tags_all', 'tags__all')):
+        codes = {tag.strip().upper() for tag in params.get(param, '').split(',') if tag.strip()}
+        if not codes:
+            continue
+        if not codes <= TAG_BITS.keys():
+            # страв із невідомим тегом немає: для any рахуємо лише відомі, для all — нічого
+            if lookup == 'tags__all':
+                return queryset.none()
+            codes &= TAG_BITS.keys()
+        queryset = queryset.filter(**{lookup: tag_mask(codes)})
+
+    return queryset
+
+
+def rank_by_ids(queryset, ids):
+    # порядок id з FTS5 (bm25) переносимо в ORDER BY
+    ranking = Case(
+        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=ids).order_by(ranking) if ids else queryset.none()
+
+
+def search_dishes(queryset, query):
+    if not search.is_supported():
+        return queryset.filter(Q(name__icontains=query) | Q(description__icontains=query))
+    return rank_by_ids(queryset, search.search_ids(query, queryset))
+
+
+# гарячі списки: orjson замість json, з тим самим виводом (див. renderers.py)
+LIST_RENDERERS = [FastJSONRenderer, BrowsableAPIRenderer]
+
+
+def requested_fields(params, serializer_class):
+    """
+    ?fields=id,name,price — лише ці поля; ?expand=reviews — плюс ці зв'язки.
+    None, якщо ?fields= немає: тоді віддаються всі поля, як і раніше.
+    """
+    fields = params.get('fields')
+    if fields is None:
+        return None
+    names = {name.strip() for value in (fields, params.get('expand', '')) for name in value.split(',')}
+    # невідомі імена ігноруємо; id лишається завжди
+    return (names & set(serializer_class.Meta.fields)) | {'id'}
+
+
+def latest_reviews_prefetch():
+    # останні EMBEDDED_REVIEWS відгуків кожної страви одним запитом (віконна функція)
+    return Prefetch(
+        'reviews',
+        queryset=Review.objects.select_related('user').order_by('-date', '-id')[:EMBEDDED_REVIEWS],
+        to_attr='latest_reviews',
+    )
+
+
+class SparseFieldsViewMixin:
+    """Передає ?fields= / ?expand= у серіалізатор для читання; wants() — чи потрібне поле."""
+
+    def requested_fields(self):
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = requested_fields(self.request.query_params, self.get_serializer_class())
+        return self._requested_fields
+
+    def wants(self, name):
+        fields = self.requested_fields()
+        return fields is None or name in fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in permissions.SAFE_METHODS:
+            kwargs.setdefault('fields', self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
 
-class DishViewSet(viewsets.ModelViewSet):
-    queryset = Dish.objects.filter(is_available=True)
+
+class DishViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
+    queryset = Dish.objects.filter(is_available=True).select_related('category')
     permission_classes = [permissions.AllowAny]
+    renderer_classes = LIST_RENDERERS
 
     def get_serializer_class(self):
         if self.action == 'list':
             return DishListSerializer
         return DishDetailSerializer
 
+    def list(self, request, *args, **kwargs):
+        fast = settings.FAST_LIST_RENDERING and self.requested_fields() is None
+        handler = self.fast_list if fast else super().list
+        return self._snapshot_response(request, 'list', handler, *args, **kwargs)
+
+    def fast_list(self, request, *args, **kwargs):
+        # ті самі дані, що й DishListSerializer, але з values_list без моделей
+        return Response(dish_list_rows(self.filter_queryset(self.get_queryset()), request))
+
+    def retrieve(self, request, *args, **kwargs):
+        scope = f"detail:{kwargs.get(self.lookup_url_kwarg or self.lookup_field)}"
+        return self._snapshot_response(request, scope, super().retrieve, *args, **kwargs)
+
+    def _snapshot_response(self, request, scope, handler, *args, **kwargs):
+        # меню змінюється рідко: віддаємо готовий знімок під поточну версію
+        key = menu_cache.snapshot_key(request, scope)
+        snapshot = menu_cache.get_snapshot(key)
+        if snapshot is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            snapshot = menu_cache.store_snapshot(key, response.data)
+
+        etag, data = snapshot
+        if menu_cache.etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(data, headers={'ETag': etag})
+
     def get_queryset(self):
         queryset = super().get_queryset()
+        if not self.wants('category'):
+            queryset = queryset.select_related(None)
+        if self.action != 'list' and self.wants('reviews'):
+            queryset = queryset.prefetch_related(latest_reviews_prefetch())
+
+        queryset = filter_dishes(queryset, self.request.query_params)
+        query = self.request.query_params.get('q', '').strip()
+        if query:
+            queryset = search_dishes(queryset, query)
+        return queryset
 
-        category_name = self.request.query_params.get('category')
-        max_price = self.request.query_params.get('max_price')
-        tags_str = self.request.query_params.get('tags')
-
-        if category_name:
-            queryset = queryset.filter(category__name__iexact=category_name)
-
-        if max_price:
-            try:
-                max_price = float(max_price)
-                queryset = queryset.filter(price__lte=max_price)
-            except ValueError:
-                pass
-
-        if tags_str:
-            tags_list = [tag.strip().upper() for tag in tags_str.split(',')]
-            queryset = queryset.filter(tags__in=tags_list)
+    @action(detail=False, methods=['get'])
+    def match(self, request, *args, **kwargs):
+        """
+        GET /api/dishes/match/?q=додай дві піци маргарита&limit=5
+        Кандидати з нечіткого індексу в пам'яті (matcher.py), найкращий — перший.
+        """
+        phrase = request.query_params.get('q', '').strip()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 5)), 1), 20)
+        except ValueError:
+            limit = 5
+        return Response({'query': phrase, 'results': matcher.match(phrase, limit, request)})
+
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[permissions.IsAdminUser])
+    def import_menu(self, request, *args, **kwargs):
+        """
+        POST /api/dishes/import/?dry_run=1
+        body: JSON-список страв або multipart-файл `file` (.csv / .json)
+        Поля: name, description, price, category, is_available, tags.
+        """
+        upload = request.FILES.get('file')
+        if upload is not None:
+            fmt = 'json' if upload.name.lower().endswith('.json') else 'csv'
+            rows = menu_import.read_rows(upload.read(), fmt)
+        else:
+            rows = request.data
 
-        return queryset
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        report = menu_import.import_menu(rows, dry_run=dry_run)
+        return Response(report, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
 
     def perform_create(self, serializer):
         category_name = self.request.data.get("category")
@@ -64,14 +229,53 @@ class DishViewSet(viewsets.ModelViewSet):
 
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+def orders_with_items(user=True, items=True):
+    # OrderSerializer читає user_info та items[].dish.name; непотрібне (?fields=) не тягнемо
+    queryset = Order.objects.all()
+    if user:
+        queryset = queryset.select_related('user')
+    if items:
+        queryset = queryset.prefetch_related(Prefetch('items', queryset=OrderItem.objects.select_related('dish')))
+    return queryset
+
+
+class OrderViewSet(SparseFieldsViewMixin, viewsets.ModelViewSet):
     serializer_class = OrderSerializer
+    renderer_classes = LIST_RENDERERS
+    pagination_class = DateCursorPagination
+    # ліміт замовлень в одному POST /api/orders/batch/
+    batch_max_orders = 100
+    throttle_scope = 'orders'
 
     def get_permissions(self):
-        if self.action == 'create':
+        if self.action in ('create', 'batch'):
             return [permissions.AllowAny()]
         return [permissions.IsAuthenticated()]
 
+    def get_throttles(self):
+        if self.action in ('create', 'batch'):
+            return [IPBucketThrottle(), UserBucketThrottle()]
+        return super().get_throttles()
+
+    @idempotency.idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'])
+    @idempotency.idempotent
+    def batch(self, request, *args, **kwargs):
+        """
+        POST /api/orders/batch/
+        body: [ { "items": [ { "dish": 1, "quantity": 2 } ] }, ... ]
+        Усі замовлення створюються в одній транзакції.
+        """
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False, max_length=self.batch_max_orders
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     # 👇 2. Розумна фільтрація
     def get_queryset(self):
         user = self.request.user
@@ -79,17 +283,20 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not user.is_authenticated:
             return Order.objects.none()
 
+        orders = orders_with_items(user=self.wants('user_info'), items=self.wants('items'))
         if user.is_staff:
-            return Order.objects.all().order_by('-date')
+            return orders.order_by('-date')
 
-        return Order.objects.filter(user=user).order_by('-date')
+        return orders.filter(user=user).order_by('-date')
 
 
 class OrderStatusUpdateAPIView(generics.UpdateAPIView):
-    queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAdminUser]
 
+    def get_queryset(self):
+        return orders_with_items()
+
     def update(self, request, *args, **kwargs):
         instance = self.get_object()
         new_status = request.data.get('status')
@@ -102,10 +309,28 @@ class OrderStatusUpdateAPIView(generics.UpdateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        previous_status = instance.status
         instance.status = new_status
-        instance.save(update_fields=['status'])
-
         serializer = self.get_serializer(instance)
+        with transaction.atomic():
+            # compare-and-set: паралельний PATCH не порахує замовлення в підсумках двічі
+            updated = Order.objects.filter(pk=instance.pk, status=previous_status).update(status=new_status)
+            if not updated:
+                return Response(
+                    {"error": "Статус замовлення щойно змінився, оновіть дані."},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            if new_status == 'COMPLETED' and previous_status != 'COMPLETED':
+                analytics.apply_order(instance, sign=1)
+                purchases.record_order(instance)
+            elif previous_status == 'COMPLETED' and new_status != 'COMPLETED':
+                analytics.apply_order(instance, sign=-1)
+                purchases.forget_order(instance)
+
+            events.publish(events.ORDER_STATUS, [serializer.data])
+            kitchen.invalidate()
+
         return Response(serializer.data)
 
 
@@ -115,30 +340,29 @@ class ReviewCreateAPIView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
-        dish_id = self.request.data.get('dish')
         user = self.request.user
-        has_completed_order = Order.objects.filter(
-            user=user,
-            status='COMPLETED',
-            items__dish_id=dish_id
-        ).exists()
-
-        if not has_completed_order:
+        dish = serializer.validated_data['dish']
+        if not PurchasedDish.objects.filter(pk=(user.pk, dish.pk)).exists():
             raise serializers.ValidationError(
                 {
                     "detail": "Ви можете залишити відгук лише на страву, яку замовляли, і ваше замовлення має бути завершено."
                 }
             )
-        if Review.objects.filter(user=user, dish_id=dish_id).exists():
+        # повтор ловить unique_together (dish, user) — без окремого запиту наперед
+        try:
+            with transaction.atomic():
+                serializer.save(user=user)
+        except IntegrityError:
             raise serializers.ValidationError(
                 {"detail": "Ви вже залишили відгук на цю страву."}
             )
-        serializer.save(user=user)
 
 
 class RegisterAPIView(generics.GenericAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [IPBucketThrottle]
+    throttle_scope = 'register'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -158,12 +382,18 @@ class LoginAPIView(ObtainAuthToken):
     POST /api/login/
     body: { "username": "...", "password": "..." }
     return: { "token": "...", "user": { ... } }
+    Ліміт і з IP, і на ім'я користувача: хешування пароля свідомо дороге.
     """
+    throttle_classes = [IPBucketThrottle, UserBucketThrottle]
+    throttle_scope = 'login'
+
     def post(self, request, *args, **kwargs):
         # стандартна перевірка логіну/пароля
-        response = super().post(request, *args, **kwargs)
-        token = Token.objects.get(key=response.data["token"])
-        user = token.user
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        # єдиний запит по токену: користувач уже є з перевірки пароля
+        token, _ = Token.objects.get_or_create(user=user)
 
         return Response({
             "token": token.key,
@@ -173,8 +403,100 @@ class LoginAPIView(ObtainAuthToken):
 
 class DishReviewsListAPIView(generics.ListAPIView):
     serializer_class = ReviewSerializer
+    renderer_classes = LIST_RENDERERS
+    pagination_class = DateCursorPagination
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
         dish_id = self.kwargs['dish_id']
-        return Review.objects.filter(dish_id=dish_id).order_by('-date')
+        return Review.objects.filter(dish_id=dish_id).select_related('user').order_by('-date')
+
+
+def parse_date_param(value):
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+class SalesAnalyticsAPIView(APIView):
+    """
+    GET /api/analytics/sales/?date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&category=...
+    За замовчуванням — останні 7 днів. Читає лише денні підсумки DailyDishSales.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    default_days = 7
+
+    def get(self, request, *args, **kwargs):
+        try:
+            date_to = parse_date_param(request.query_params.get('date_to')) or timezone.localdate()
+            date_from = parse_date_param(request.query_params.get('date_from')) or (
+                date_to - timezone.timedelta(days=self.default_days - 1)
+            )
+        except ValueError:
+            return Response(
+                {"error": "Дати мають бути у форматі YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if date_from > date_to:
+            return Response(
+                {"error": "date_from не може бути пізніше за date_to."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        report = analytics.sales_report(date_from, date_to, category=request.query_params.get('category'))
+        return Response(SalesReportSerializer(report).data)
+
+
+class KitchenBoardAPIView(APIView):
+    """
+    GET /api/kitchen/
+    Скільки порцій кожної страви чекає в NEW / IN_PROGRESS замовленнях і як давно.
+    Дошка кешується до наступного нового замовлення чи зміни статусу.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(kitchen.with_ages(kitchen.get_board()))
+
+
+class OrderEventTokenAPIView(APIView):
+    """
+    POST /api/orders/events/token/
+    Короткоживучий токен для GET /api/orders/events/?stream_token=...
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        return Response({
+            "stream_token": events.issue_stream_token(request.user),
+            "expires_in": settings.ORDER_STREAM_TOKEN_SECONDS,
+        })
+
+
+class OrderExportAPIView(APIView):
+    """
+    GET /api/orders/export/?format=csv|ndjson&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD
+    Стрімить замовлення з позиціями порціями, не збираючи їх у пам'яті.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [exports.CSVRenderer, exports.NDJSONRenderer]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            date_from = parse_date_param(request.query_params.get('date_from'))
+            date_to = parse_date_param(request.query_params.get('date_to'))
+        except ValueError:
+            return Response(
+                {"error": "Дати мають бути у форматі YYYY-MM-DD."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        renderer = request.accepted_renderer
+        lines = exports.WRITERS[renderer.format](exports.iter_orders(date_from, date_to))
+        response = StreamingHttpResponse(lines, content_type=f"{renderer.media_type}; charset=utf-8")
+        response['Content-Disposition'] = f'attachment; filename="orders.{renderer.format}"'
+        return response
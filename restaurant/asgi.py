@@ -5,6 +5,14 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+The live order stream (/api/orders/events/) only stays open under an ASGI
+server, e.g. ``uvicorn restaurant.asgi:application``; under WSGI it returns
+the pending events and closes.
+
+Under ASGI the read-only menu endpoints are also served natively async at
+/api/async/dishes/... (same responses as /api/dishes/...); compare both with
+``python manage.py benchmark_concurrency``.
 """
 
 import os
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -47,6 +50,9 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    # першим, щоб час запиту включав решту middleware
+    'menu_api.metrics.PerformanceMiddleware',
+    'menu_api.db_routing.ReadYourWritesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -57,6 +63,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# /api/metrics/ для Prometheus-скрейпера: `Authorization: Bearer <METRICS_TOKEN>`;
+# без змінної оточення — лише для staff
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# поріг (мс) для логування повільних запитів разом з їхніми SQL; None — вимкнено
+SLOW_REQUEST_MS = None
 
 ROOT_URLCONF = 'restaurant.urls'
 
@@ -81,13 +93,74 @@ WSGI_APPLICATION = 'restaurant.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DJANGO_DB_PROFILE=production — постійні з'єднання з перевіркою перед запитом.
+# DATABASE_REPLICA_NAME=<файл> — додає аліас 'replica' для читань (див. menu_api.db_routing);
+# локально репліку наповнює ``manage.py sync_replica``.
+DB_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'development')
+
+SQLITE_OPTIONS = {
+    # WAL: читачі не блокують запис і навпаки; NORMAL у WAL не втрачає цілісності
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+    # busy_timeout, с: чекати на блокування замість "database is locked"
+    'timeout': 20,
+    # BEGIN IMMEDIATE: транзакція одразу бере write-lock і не падає при апгрейді read -> write
+    'transaction_mode': 'IMMEDIATE',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': 600 if DB_PROFILE == 'production' else 0,
+        'CONN_HEALTH_CHECKS': DB_PROFILE == 'production',
+    }
+}
+
+if os.environ.get('DATABASE_REPLICA_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DATABASE_REPLICA_NAME'],
+        # у тестах репліка — те саме з'єднання, що й primary
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['menu_api.db_routing.PrimaryReplicaRouter']
+
+# скільки секунд після запису клієнт читає з primary (read-your-writes)
+REPLICA_STICKY_SECONDS = 5
+
+# скільки секунд процес пам'ятає версію меню (menu_api/cache.py), перш ніж
+# перечитати її з бази: стільки інші воркери можуть віддавати старий знімок
+MENU_VERSION_TTL_SECONDS = 1
+
+# те саме для версії кухонної дошки (menu_api/kitchen.py)
+KITCHEN_BOARD_VERSION_TTL_SECONDS = 1
+
+# SSE-стрім замовлень (menu_api/events.py): скільки годин зберігати журнал подій
+# і скільки секунд живе токен ?stream_token= для EventSource
+ORDER_EVENT_RETENTION_HOURS = 24
+ORDER_STREAM_TOKEN_SECONDS = 300
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # завершені відповіді за Idempotency-Key (menu_api/idempotency.py): лише копія в
+    # процесі, щоб повтор не йшов у базу; сам ключ займається рядком IdempotencyKey
+    'idempotency': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'idempotency',
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
+# скільки дублікат чекає, поки перший запит з тим самим Idempotency-Key завершиться,
+# перш ніж отримати 409 з Retry-After, і скільки годин зберігати ключі в базі
+IDEMPOTENCY_WAIT_SECONDS = 1
+IDEMPOTENCY_KEY_RETENTION_HOURS = 24
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -134,14 +207,31 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'x-db-primary')
+CORS_EXPOSE_HEADERS = ('idempotent-replayed', 'x-db-primary')
+
+# список страв будується з values_list замість DishListSerializer (той самий JSON)
+FAST_LIST_RENDERING = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'menu_api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # token bucket (menu_api/throttling.py): "N/період" — до N запитів поспіль,
+    # далі по одному кожні період/N; ключ — "<throttle_scope>.<ip|user>"
+    'DEFAULT_THROTTLE_RATES': {
+        'orders.ip': '30/min',
+        'orders.user': '20/min',
+        'register.ip': '5/hour',
+        'login.ip': '20/min',
+        'login.user': '5/min',
+    },
 }
 
+# стан лімітів: окремий SQLite-файл, спільний для воркерів на цій машині
+THROTTLE_STORE = BASE_DIR / 'throttle.sqlite3'
+
 
 
 
@@ -13,9 +13,23 @@ api.interceptors.request.use((config) => {
     config.headers = config.headers ?? {};
     config.headers["Authorization"] = `Token ${raw}`;
   }
+  // після запису кілька секунд читаємо з primary (menu_api/db_routing.py):
+  // cookie між origin-ами не ходить, тому повертаємо підписану мітку заголовком
+  if (dbPrimaryToken) {
+    config.headers = config.headers ?? {};
+    config.headers["X-DB-Primary"] = dbPrimaryToken;
+  }
   return config;
 });
 
+let dbPrimaryToken: string | null = null;
+
+api.interceptors.response.use((response) => {
+  const token = response.headers["x-db-primary"];
+  if (token) dbPrimaryToken = token;
+  return response;
+});
+
 // залишаємо, якщо десь викликаєш явно
 export function setAuthToken(token: string | null) {
   if (token) {
@@ -24,3 +38,17 @@ export function setAuthToken(token: string | null) {
     delete api.defaults.headers.common["Authorization"];
   }
 }
+
+// курсорні сторінки бека (DateCursorPagination): { next, previous, results }
+export type Page<T> = {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+};
+
+// одна сторінка: url — перша сторінка або посилання next з попередньої
+// (воно абсолютне, axios його приймає); решту історії довантажує "Показати ще"
+export async function getPage<T>(url: string): Promise<Page<T>> {
+  const { data } = await api.get<Page<T>>(url);
+  return data;
+}
@@ -1,4 +1,4 @@
-import { api } from "./client";
+import { api, getPage } from "./client";
 import type { Dish, Review } from "../types";
 
 const BACKEND_URL = "http://localhost:8000";
@@ -12,10 +12,12 @@ type ApiDish = {
   price: string | number;
   category: ApiCategory;
   photo?: string | null;
+  // готові варіанти фото (див. menu_api/images.py): { card: { webp, jpeg }, ... }
+  photo_variants?: Record<string, { webp?: string; jpeg?: string }> | null;
   imageUrl?: string | null;
   rating?: string | number | null;
   is_available?: boolean;
-  tags?: string | string[] | null; // бек може віддати рядок або масив
+  tags?: string | string[] | null; // бек віддає масив назв тегів
 };
 
 function mapApiDish(apiDish: ApiDish): Dish {
@@ -27,7 +29,9 @@ function mapApiDish(apiDish: ApiDish): Dish {
   }
 
   let imageUrl = "";
-  const rawPhoto = apiDish.photo ?? apiDish.imageUrl ?? "";
+  // у сітці меню вистачає card-варіанта замість оригіналу
+  const rawPhoto =
+    apiDish.photo_variants?.card?.webp ?? apiDish.photo ?? apiDish.imageUrl ?? "";
   if (rawPhoto) {
     imageUrl = rawPhoto.startsWith("http")
       ? rawPhoto
@@ -60,6 +64,15 @@ export async function getDishes(params?: {
   return data.map(mapApiDish);
 }
 
+// нечіткий пошук страви за фразою голосу (menu_api/matcher.py); null — не розпізнано
+export async function matchDish(phrase: string): Promise<Dish | null> {
+  const { data } = await api.get<{ results: { dish: ApiDish }[] }>(
+    "/api/dishes/match/",
+    { params: { q: phrase, limit: 1 } }
+  );
+  return data.results.length ? mapApiDish(data.results[0].dish) : null;
+}
+
 export async function getDish(id: number): Promise<Dish> {
   const { data } = await api.get<ApiDish>(`/api/dishes/${id}/`);
   return mapApiDish(data);
@@ -76,16 +89,24 @@ type ApiReview = {
   date: string; // як у Django-моделі
 };
 
-export async function getDishReviews(id: number): Promise<Review[]> {
-  const { data } = await api.get<ApiReview[]>(`/api/dishes/${id}/reviews/`);
-  return data.map((r) => ({
-    id: r.id,
-    dish: r.dish,
-    user: r.user,
-    rating: r.rating,
-    comment: r.comment,
-    created_at: r.date,
-  }));
+// бек віддає сторінки з курсором: { next, previous, results };
+// next — посилання з попередньої сторінки, без нього — найновіші відгуки
+export async function getDishReviews(
+  id: number,
+  next?: string | null
+): Promise<{ reviews: Review[]; next: string | null }> {
+  const data = await getPage<ApiReview>(next ?? `/api/dishes/${id}/reviews/`);
+  return {
+    reviews: data.results.map((r) => ({
+      id: r.id,
+      dish: r.dish,
+      user: r.user,
+      rating: r.rating,
+      comment: r.comment,
+      created_at: r.date,
+    })),
+    next: data.next,
+  };
 }
 
 // ------- CRUD ДЛЯ АДМІНКИ --------
@@ -1,4 +1,5 @@
-import { api } from "./client";
+import axios from "axios";
+import { api, getPage } from "./client";
 import type { Order, OrderStatus } from "../types";
 
 type ApiOrder = {
@@ -37,17 +38,35 @@ export async function createOrder(
     })),
   };
 
-  const { data } = await api.post<ApiOrder>("/api/orders/", payload);
-  return data;
+  // один ключ на всі повтори: бек поверне вже створене замовлення замість дубліката
+  const headers = { "Idempotency-Key": crypto.randomUUID() };
+  for (let attempt = 1; ; attempt++) {
+    try {
+      const { data } = await api.post<ApiOrder>("/api/orders/", payload, { headers });
+      return data;
+    } catch (err) {
+      // повторюємо лише обрив зв'язку (немає відповіді) або 409 "ще виконується"
+      const status = axios.isAxiosError(err) ? err.response?.status : undefined;
+      const retriable = axios.isAxiosError(err) && (status === undefined || status === 409);
+      if (!retriable || attempt >= 3) throw err;
+      await new Promise((resolve) => setTimeout(resolve, 500 * attempt));
+    }
+  }
 }
 
-export async function getMyOrders(): Promise<Order[]> {
-  const { data } = await api.get<ApiOrder[]>("/api/orders/");
-  return data.map((o) => ({
-    id: o.id,
-    status: mapStatus(o.status),
-    total: Number(o.sums),
-    created_at: o.date,
-    items: [],
-  }));
+// next — посилання з попередньої сторінки; без нього — найновіші замовлення
+export async function getMyOrders(
+  next?: string | null
+): Promise<{ orders: Order[]; next: string | null }> {
+  const data = await getPage<ApiOrder>(next ?? "/api/orders/");
+  return {
+    orders: data.results.map((o) => ({
+      id: o.id,
+      status: mapStatus(o.status),
+      total: Number(o.sums),
+      created_at: o.date,
+      items: [],
+    })),
+    next: data.next,
+  };
 }
@@ -28,6 +28,19 @@ interface AdminOrder extends Order {
   user_info?: { username: string; email: string } | null;
 }
 
+const mapOrder = (o: any): AdminOrder => ({
+  id: o.id,
+  created_at: o.date,
+  total: Number(o.sums),
+  status: STATUS_MAP[o.status] || "new",
+  user_info: o.user_info || null,
+  items: o.items.map((i: any) => ({
+    dish: { name: i.dish_name } as Dish,
+    quantity: i.quantity,
+    price: Number(i.price)
+  }))
+});
+
 export function AdminPage() {
   const [token, setToken] = useState<string | null>(localStorage.getItem("authToken"));
   const [activeTab, setActiveTab] = useState<"menu" | "orders">("menu");
@@ -45,6 +58,8 @@ export function AdminPage() {
   });
 
   const [orders, setOrders] = useState<AdminOrder[]>([]);
+  // посилання на старіші замовлення; нові приходять SSE-стрімом нижче
+  const [nextOrders, setNextOrders] = useState<string | null>(null);
 
   useEffect(() => {
     if (token) {
@@ -53,6 +68,49 @@ export function AdminPage() {
     }
   }, [token]);
 
+  // живі оновлення замовлень замість повторного fetchOrders()
+  useEffect(() => {
+    if (!token) return;
+    let source: EventSource | null = null;
+    let lastEventId = "";
+    let closed = false;
+    const upsert = (e: MessageEvent) => {
+      lastEventId = e.lastEventId;
+      const order = mapOrder(JSON.parse(e.data));
+      setOrders(prev =>
+        prev.some(o => o.id === order.id)
+          ? prev.map(o => (o.id === order.id ? order : o))
+          : [order, ...prev]
+      );
+    };
+    // API-токен у URL осів би в логах, тому стрім відкриваємо з короткоживучим
+    // stream_token; коли той прострочиться, сервер відповість 403 і EventSource
+    // закриється — беремо новий токен і продовжуємо з останньої події
+    const connect = async () => {
+      const res = await fetch(`${API_URL}/orders/events/token/`, {
+        method: "POST",
+        headers: { "Authorization": `Token ${token}` }
+      });
+      if (!res.ok || closed) return;
+      const { stream_token } = await res.json();
+      const params = new URLSearchParams({ stream_token });
+      if (lastEventId) params.set("last_event_id", lastEventId);
+      source = new EventSource(`${API_URL}/orders/events/?${params}`);
+      source.addEventListener("order.created", upsert);
+      source.addEventListener("order.status", upsert);
+      source.onerror = () => {
+        if (source?.readyState === EventSource.CLOSED && !closed) {
+          setTimeout(() => connect().catch(console.error), 3000);
+        }
+      };
+    };
+    connect().catch(console.error);
+    return () => {
+      closed = true;
+      source?.close();
+    };
+  }, [token]);
+
   const fetchDishes = async () => {
     try {
       const res = await fetch(`${API_URL}/dishes/`);
@@ -63,33 +121,38 @@ export function AdminPage() {
           imageUrl: d.photo,
           category: typeof d.category === 'object' ? d.category.name : d.category,
           rating: d.rating || 0,
-          tags: d.tags ? d.tags.split(',') : []
+          tags: Array.isArray(d.tags) ? d.tags : []
         }));
         setDishes(mappedDishes);
       }
     } catch (err) { console.error(err); }
   };
 
+  // одна курсорна сторінка: перша — при вході, далі — за кнопкою "Показати ще"
+  const fetchOrdersPage = async (url: string) => {
+    const res = await fetch(url, {
+      headers: { "Authorization": `Token ${token}` }
+    });
+    if (!res.ok) return null;
+    const page = await res.json();
+    setNextOrders(page.next);
+    return page.results.map(mapOrder) as AdminOrder[];
+  };
+
   const fetchOrders = async () => {
     try {
-      const res = await fetch(`${API_URL}/orders/`, {
-        headers: { "Authorization": `Token ${token}` }
-      });
-      if (res.ok) {
-        const rawData = await res.json();
-        const mappedOrders: AdminOrder[] = rawData.map((o: any) => ({
-          id: o.id,
-          created_at: o.date,
-          total: Number(o.sums),
-          status: STATUS_MAP[o.status] || "new",
-          user_info: o.user_info || null,
-          items: o.items.map((i: any) => ({
-            dish: { name: i.dish_name } as Dish,
-            quantity: i.quantity,
-            price: Number(i.price)
-          }))
-        }));
-        setOrders(mappedOrders);
+      const firstPage = await fetchOrdersPage(`${API_URL}/orders/`);
+      if (firstPage) setOrders(firstPage);
+    } catch (err) { console.error(err); }
+  };
+
+  const loadMoreOrders = async () => {
+    if (!nextOrders) return;
+    try {
+      const older = await fetchOrdersPage(nextOrders);
+      if (older) {
+        // замовлення, що вже прийшли стрімом, не дублюємо
+        setOrders(prev => [...prev, ...older.filter(o => !prev.some(p => p.id === o.id))]);
       }
     } catch (err) { console.error(err); }
   };
@@ -154,7 +217,7 @@ export function AdminPage() {
       });
 
       if (res.ok) {
-        setOrders(orders.map(o => o.id === orderId ? { ...o, status: newStatus } : o));
+        setOrders(prev => prev.map(o => o.id === orderId ? { ...o, status: newStatus } : o));
       }
     } catch { alert("Не вдалося оновити статус"); }
   };
@@ -199,7 +262,7 @@ export function AdminPage() {
           <h1 style={{ margin: 0, color: theme.gold }}>Панель керування</h1>
           <div style={{ display: "flex", gap: "10px" }}>
             <button onClick={() => setActiveTab("menu")} style={activeTab === "menu" ? activeTabStyle : tabStyle}>📜 Меню</button>
-            <button onClick={() => { setActiveTab("orders"); fetchOrders(); }} style={activeTab === "orders" ? activeTabStyle : tabStyle}>📦 Замовлення</button>
+            <button onClick={() => setActiveTab("orders")} style={activeTab === "orders" ? activeTabStyle : tabStyle}>📦 Замовлення</button>
             <button onClick={() => { setToken(null); localStorage.removeItem("authToken"); }} style={{...tabStyle, background: theme.danger, border: "none"}}>Вихід</button>
           </div>
         </div>
@@ -338,6 +401,11 @@ export function AdminPage() {
                   </tbody>
                 </table>
                 {orders.length === 0 && <div style={{ padding: "20px", textAlign: "center", color: "#666" }}>Замовлень поки немає</div>}
+                {nextOrders && (
+                  <div style={{ padding: "15px", textAlign: "center" }}>
+                    <button onClick={loadMoreOrders} style={tabStyle}>Показати ще</button>
+                  </div>
+                )}
               </div>
             </div>
         )}
@@ -13,6 +13,7 @@ export function DishDetailsPage() {
 
   const [dish, setDish] = useState<Dish | null>(null);
   const [reviews, setReviews] = useState<Review[]>([]);
+  const [nextReviews, setNextReviews] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
 
   const [rating, setRating] = useState(5);
@@ -27,16 +28,25 @@ export function DishDetailsPage() {
       const d = await getDish(dishId);
       const r = await getDishReviews(dishId);
       setDish(d);
-      setReviews(r);
+      setReviews(r.reviews);
+      setNextReviews(r.next);
     } catch {
       const localDish = mockDishes.find((d) => d.id === dishId) || null;
       setDish(localDish);
       setReviews([]);
+      setNextReviews(null);
     } finally {
       setLoading(false);
     }
   };
 
+  const loadMoreReviews = async () => {
+    if (!nextReviews) return;
+    const r = await getDishReviews(dishId, nextReviews);
+    setReviews((prev) => [...prev, ...r.reviews]);
+    setNextReviews(r.next);
+  };
+
   useEffect(() => {
     if (!Number.isNaN(dishId)) {
       load();
@@ -121,6 +131,11 @@ export function DishDetailsPage() {
               <div className="review-text">{r.comment}</div>
             </div>
           ))}
+          {nextReviews && (
+            <button className="btn btn-outline" onClick={loadMoreReviews}>
+              Показати ще відгуки
+            </button>
+          )}
 
           <h4 className="section-title">Залишити відгук</h4>
           {!user && <div className="muted">Увійди, щоб залишити відгук.</div>}
@@ -8,6 +8,7 @@ import type { Order } from "../types";
 export function ProfilePage() {
   const { user } = useAuth();
   const [orders, setOrders] = useState<Order[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
 
   // "банківська карта" суто на фронті
@@ -21,8 +22,9 @@ export function ProfilePage() {
     const load = async () => {
       setLoading(true);
       try {
-        const data = await getMyOrders();
-        setOrders(data);
+        const page = await getMyOrders();
+        setOrders(page.orders);
+        setNextPage(page.next);
       } catch {
         // мок якщо бек лежить
         setOrders([
@@ -42,6 +44,14 @@ export function ProfilePage() {
     load();
   }, [user]);
 
+  // старіші замовлення — лише на вимогу, а не вся історія одразу
+  const loadMore = async () => {
+    if (!nextPage) return;
+    const page = await getMyOrders(nextPage);
+    setOrders((prev) => [...prev, ...page.orders]);
+    setNextPage(page.next);
+  };
+
   if (!user) {
     return (
       <div className="panel">
@@ -260,6 +270,12 @@ export function ProfilePage() {
             ))}
           </div>
         )}
+
+        {!loading && nextPage && (
+          <button className="btn btn-outline" onClick={loadMore} style={{ marginTop: 12 }}>
+            Показати ще
+          </button>
+        )}
       </section>
     </div>
   );